@@ -0,0 +1,129 @@
+import argparse
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+
+repo_dir = os.path.dirname(os.path.abspath(__file__))
+
+# Command line options of the pipeline compared by the benchmark
+configurations = {
+    "sequential": ["--no-async"],
+    "async": ["--async"],
+    "async-packing": ["--async", "--packing"],
+    "async-prefilter": ["--async", "--prefilter"],
+    "async-top-k-examples": ["--async", "--examples-top-k", "30"],
+    "async-faults": ["--async", "--fake-error-rate", "0.05", "--fake-invalid-rate", "0.1"],
+}
+
+
+def make_corpus(size, path):
+    """Synthetic corpus of `size` reports, cycling through data/reports.csv with new ids."""
+    reports = pd.read_csv(os.path.join(repo_dir, 'data/reports.csv'), sep=';')
+    corpus = reports.iloc[np.arange(size) % len(reports)].reset_index(drop=True)
+    corpus['id'] = np.arange(size)
+    corpus.to_csv(path, sep=';', index=False)
+
+
+def peak_rss_mb():
+    # ru_maxrss is in bytes on macOS and in kilobytes on Linux
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 ** 2 if sys.platform == "darwin" else peak / 1024
+
+
+def run_child(main_args, size):
+    """Run the pipeline in this process and print its measurements as JSON."""
+    from forecasting import cli, pipeline
+
+    started = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        cli.main(main_args)
+    elapsed = time.perf_counter() - started
+    latencies = np.array(pipeline.request_latencies or [0.0])
+    model = pipeline.get_model()
+    print(json.dumps({
+        "docs": size,
+        "seconds": elapsed,
+        "docs_per_sec": size / elapsed,
+        "requests": model.requests,
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "p99_ms": float(np.percentile(latencies, 99) * 1000),
+        "peak_rss_mb": peak_rss_mb(),
+        "prompt_tokens": model.prompt_tokens,
+        "prompt_tokens_per_doc": model.prompt_tokens / size,
+        "completion_tokens": model.completion_tokens,
+    }))
+
+
+def run_benchmark(name, size, corpus_path, out_dir, options):
+    main_args = configurations[name] + [
+        "--backend", "fake",
+        "--no-cache",
+        "--input", corpus_path,
+        "--output", os.path.join(out_dir, f"{name}-{size}.csv"),
+        "--metrics", os.path.join(out_dir, f"metrics-{name}-{size}.jsonl"),
+        "--fake-responses", os.path.join(repo_dir, "data/forecasts.csv"),
+        "--max-concurrency", str(options.concurrency),
+        "--requests-per-minute", str(options.requests_per_minute),
+        "--tokens-per-minute", str(options.tokens_per_minute),
+        "--fake-latency", str(options.latency),
+        "--fake-seed", str(options.seed),
+    ]
+    # A separate process per run, so peak RSS is measured for that run alone
+    completed = subprocess.run(
+        [sys.executable, os.path.abspath(__file__), "--child", str(size), "--"] + main_args,
+        cwd=repo_dir, capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"Benchmark {name} with {size} documents failed:\n{completed.stderr}")
+    return {"configuration": name, **json.loads(completed.stdout.strip().splitlines()[-1])}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the extraction pipeline against the fake model.")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000],
+                        help="corpus sizes in documents (e.g. 10 100 1000 10000 100000)")
+    parser.add_argument("--configurations", nargs="+", choices=list(configurations), default=list(configurations))
+    parser.add_argument("--latency", type=float, default=0.2, help="median latency of the fake model in seconds")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--requests-per-minute", type=int, default=10 ** 9)
+    parser.add_argument("--tokens-per-minute", type=int, default=10 ** 12)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--results", help="write the results to this CSV file")
+    parser.add_argument("--child", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("main_args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    options = parser.parse_args()
+
+    if options.child is not None:
+        run_child(options.main_args[1:], options.child)
+        return
+
+    rows = []
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        for size in options.sizes:
+            corpus_path = os.path.join(tmp_dir, f"reports-{size}.csv")
+            make_corpus(size, corpus_path)
+            for name in options.configurations:
+                row = run_benchmark(name, size, corpus_path, tmp_dir, options)
+                rows.append(row)
+                print(f"{name:<20} {size:>7} docs  {row['docs_per_sec']:9.1f} docs/s  "
+                      f"p50 {row['p50_ms']:8.1f} ms  p95 {row['p95_ms']:8.1f} ms  p99 {row['p99_ms']:8.1f} ms  "
+                      f"RSS {row['peak_rss_mb']:7.1f} MB  {row['prompt_tokens_per_doc']:8.0f} prompt tokens/doc",
+                      flush=True)
+
+    if options.results:
+        pd.DataFrame(rows).to_csv(options.results, index=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,46 @@
+"""Extraction of economic forecasts from market commentary with LLMs.
+
+Importing the package has no side effects: submodules and the names below
+are imported on first access, and the model, chains and examples are only
+built when a report is processed (see `forecasting.pipeline`).
+
+    from forecasting import Forecasts, extract, settings
+    settings.model_backend = "fake"
+    records = extract(1, "We expect CPI inflation to reach 3.5% y/y in May.")
+"""
+import importlib
+
+_submodules = {
+    "batch", "cache", "cli", "example_index", "fake_model", "pipeline", "prefilter", "prompts",
+    "postprocess", "rate_limit", "salvage", "schema", "settings", "store", "streaming", "telemetry",
+}
+
+_exports = {
+    "Classification": "schema",
+    "Forecasts": "schema",
+    "PackedClassification": "schema",
+    "PackedForecasts": "schema",
+    "ForecastStore": "store",
+    "extract": "pipeline",
+    "get_chain": "pipeline",
+    "get_examples": "pipeline",
+    "get_model": "pipeline",
+    "run": "pipeline",
+    "main": "cli",
+}
+
+__all__ = sorted(_submodules | set(_exports))
+
+
+def __getattr__(name):
+    if name in _submodules:
+        return importlib.import_module(f".{name}", __name__)
+    if name in _exports:
+        value = getattr(importlib.import_module(f".{_exports[name]}", __name__), name)
+        globals()[name] = value
+        return value
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return __all__
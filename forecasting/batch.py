@@ -0,0 +1,151 @@
+import csv
+import glob
+import json
+import os
+
+
+class ShardedJsonlWriter:
+    """Writes JSON lines to `<prefix>-0000.jsonl`, `<prefix>-0001.jsonl`, ...
+
+    A new shard is started when the current one would exceed `max_lines`
+    lines or `max_bytes` bytes (the limits of a single Batch API input file).
+    """
+
+    def __init__(self, out_dir, prefix, max_lines=50000, max_bytes=190 * 1024 * 1024):
+        self.out_dir = out_dir
+        self.prefix = prefix
+        self.max_lines = max_lines
+        self.max_bytes = max_bytes
+        self.paths = []
+        self.file = None
+        self.lines = 0
+        self.bytes = 0
+        os.makedirs(out_dir, exist_ok=True)
+
+    def _open_shard(self):
+        if self.file is not None:
+            self.file.close()
+        path = os.path.join(self.out_dir, f"{self.prefix}-{len(self.paths):04d}.jsonl")
+        self.paths.append(path)
+        self.file = open(path, "w", encoding="utf-8")
+        self.lines = 0
+        self.bytes = 0
+
+    def write(self, obj):
+        line = json.dumps(obj, ensure_ascii=False) + "\n"
+        size = len(line.encode("utf-8"))
+        if self.file is None or self.lines >= self.max_lines or self.bytes + size > self.max_bytes:
+            self._open_shard()
+        self.file.write(line)
+        self.lines += 1
+        self.bytes += size
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
+
+
+def make_custom_id(doc_id, part):
+    return f"{doc_id}-{part}"
+
+
+def split_custom_id(custom_id):
+    doc_id, part = custom_id.rsplit("-", 1)
+    return doc_id, int(part)
+
+
+def request_line(custom_id, messages, model_name, temperature, tool):
+    """Batch API request forcing the model to call `tool`, as `with_structured_output` does."""
+    return {
+        "custom_id": custom_id,
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": model_name,
+            "temperature": temperature,
+            "messages": messages,
+            "tools": [tool],
+            "tool_choice": {"type": "function", "function": {"name": tool["function"]["name"]}},
+        },
+    }
+
+
+def build_requests(requests, out_dir, prefix="requests", max_lines=50000, max_bytes=190 * 1024 * 1024):
+    """Write an iterable of request lines to sharded JSONL files and return their paths."""
+    writer = ShardedJsonlWriter(out_dir, prefix, max_lines=max_lines, max_bytes=max_bytes)
+    try:
+        for request in requests:
+            writer.write(request)
+    finally:
+        writer.close()
+    return writer.paths
+
+
+def read_jsonl(paths):
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
+
+
+def expand_paths(patterns):
+    return sorted(path for pattern in patterns for path in glob.glob(pattern))
+
+
+def tool_arguments(result):
+    """Return the parsed tool call arguments of a Batch API result line, or raise ValueError."""
+    if result.get("error"):
+        raise ValueError(f"request failed: {result['error']}")
+    response = result.get("response") or {}
+    if response.get("status_code") != 200:
+        raise ValueError(f"status code {response.get('status_code')}")
+    message = response["body"]["choices"][0]["message"]
+    if not message.get("tool_calls"):
+        raise ValueError("no tool call in the response")
+    try:
+        return json.loads(message["tool_calls"][0]["function"]["arguments"])
+    except json.JSONDecodeError as e:
+        raise ValueError(f"invalid tool call arguments: {e}")
+
+
+def ingest_results(result_paths, parse, output_path, columns, failed_path, request_paths=(), append=False):
+    """Stream Batch API results into the forecasts CSV.
+
+    `parse(doc_id, arguments)` validates the tool call arguments of one
+    request and returns its forecast records; it raises on invalid output.
+    Custom ids of failed requests, and of requests in `request_paths`
+    without a result, are written to `failed_path` for re-submission.
+    With `append`, forecasts are added to an existing output file, e.g. when
+    ingesting the results of re-submitted requests.
+    Returns the numbers of succeeded and failed requests.
+    """
+    seen = set()
+    failed = []
+    succeeded = 0
+    append = append and os.path.exists(output_path)
+    with open(output_path, "a" if append else "w", newline="", encoding="utf-8") as output:
+        writer = csv.DictWriter(output, fieldnames=columns, lineterminator="\n")
+        if not append:
+            writer.writeheader()
+        for result in read_jsonl(result_paths):
+            custom_id = result["custom_id"]
+            seen.add(custom_id)
+            doc_id, _ = split_custom_id(custom_id)
+            try:
+                records = parse(doc_id, tool_arguments(result))
+            except (ValueError, KeyError, IndexError) as e:
+                print(f"Request {custom_id} failed: {e}")
+                failed.append(custom_id)
+                continue
+            writer.writerows(records)
+            succeeded += 1
+
+    for request in read_jsonl(request_paths):
+        if request["custom_id"] not in seen:
+            failed.append(request["custom_id"])
+
+    with open(failed_path, "w", encoding="utf-8") as f:
+        f.writelines(f"{custom_id}\n" for custom_id in failed)
+    return succeeded, len(failed)
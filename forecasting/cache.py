@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+
+def make_key(template, examples, model_name, temperature, text, backend=None):
+    """Hash of everything that determines the model response for a report.
+
+    `backend` identifies a model other than the OpenAI one (e.g. the fake
+    model and its settings); it is left out for OpenAI, so existing keys stay valid.
+    """
+    fields = {
+        "template": template,
+        "examples": examples,
+        "model_name": model_name,
+        "temperature": temperature,
+        "text": text,
+    }
+    if backend is not None:
+        fields["backend"] = backend
+    payload = json.dumps(fields, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """On-disk SQLite cache of validated `Forecasts` payloads keyed by `make_key`.
+
+    Entries older than `max_age_days` are ignored and evicted; when the cache
+    grows beyond `max_size_mb`, the least recently used entries are evicted.
+    In `read_only` mode the cache is never written to.
+    """
+
+    def __init__(self, path, max_age_days=None, max_size_mb=None, read_only=False):
+        self.path = path
+        self.max_age = max_age_days * 86400 if max_age_days is not None else None
+        self.max_bytes = max_size_mb * 1024 * 1024 if max_size_mb is not None else None
+        self.read_only = read_only
+        self.hits = 0
+        self.misses = 0
+        if read_only and not os.path.exists(path):
+            self.conn = None
+            return
+        # The timeout lets several processes (e.g. shards of a run) share the cache
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        if not read_only:
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    payload TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            self.conn.execute("CREATE INDEX IF NOT EXISTS idx_accessed_at ON responses (accessed_at)")
+            self.conn.commit()
+
+    def get(self, key):
+        row = None
+        if self.conn is not None:
+            row = self.conn.execute("SELECT payload, created_at FROM responses WHERE key = ?", (key,)).fetchone()
+        if row is None or (self.max_age is not None and time.time() - row[1] > self.max_age):
+            self.misses += 1
+            return None
+        self.hits += 1
+        if not self.read_only:
+            self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key, payload):
+        if self.read_only:
+            return
+        data = json.dumps(payload)
+        now = time.time()
+        self.conn.execute(
+            "INSERT OR REPLACE INTO responses (key, payload, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+            (key, data, len(data), now, now),
+        )
+        self.conn.commit()
+
+    def evict(self):
+        """Remove expired entries, then least recently used ones above the size limit."""
+        if self.read_only or self.conn is None:
+            return 0
+        removed = 0
+        if self.max_age is not None:
+            removed += self.conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (time.time() - self.max_age,)
+            ).rowcount
+        if self.max_bytes is not None:
+            total = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+            if total > self.max_bytes:
+                to_delete = []
+                for key, size in self.conn.execute("SELECT key, size FROM responses ORDER BY accessed_at"):
+                    if total <= self.max_bytes:
+                        break
+                    to_delete.append((key,))
+                    total -= size
+                self.conn.executemany("DELETE FROM responses WHERE key = ?", to_delete)
+                removed += len(to_delete)
+        self.conn.commit()
+        return removed
+
+    def stats(self):
+        return {"hits": self.hits, "misses": self.misses}
+
+    def close(self):
+        if self.conn is not None:
+            self.conn.close()
+            self.conn = None
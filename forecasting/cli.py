@@ -0,0 +1,196 @@
+import argparse
+import os
+
+from dotenv import load_dotenv
+
+from . import settings
+
+
+def parse_shard(value):
+    """Parse `i/n` (0 <= i < n) into (i, n)."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/n, e.g. 0/4, got {value!r}")
+    if not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"shard index must be between 0 and {count - 1}, got {index}")
+    return index, count
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Extract forecasts from economic reports.")
+    parser.add_argument("--input", default=settings.filename, help="reports CSV file")
+    parser.add_argument("--output", default=settings.output_filename, help="forecasts CSV file")
+    parser.add_argument("--resume", action="store_true",
+                        help="skip reports already listed in the checkpoint file and append to the existing output")
+    parser.add_argument("--chunksize", type=int, default=1000, help="number of reports read at a time")
+    parser.add_argument("--flush-every", type=int, default=50,
+                        help="number of reports after which the output and the checkpoint are flushed")
+    parser.add_argument("--shard", type=parse_shard, metavar="I/N",
+                        help="process only shard I of N (0-based); the output and metrics files get a -shardIofN suffix")
+    parser.add_argument("--merge", type=int, metavar="N",
+                        help="merge the outputs of shards 0..N-1 into --output, in the order of the reports in --input")
+    parser.add_argument("--incremental", action="store_true",
+                        help="skip reports already in the forecast store with the same text (needs --store); "
+                             "--output then only gets the new and changed reports")
+    parser.add_argument("--export", action="store_true", help="write the forecasts in the forecast store to --output")
+    parser.add_argument("--postprocess", metavar="PATH",
+                        help="normalize the forecasts in --output, mark near-duplicates and write them to PATH")
+    parser.add_argument("--collapse", action="store_true",
+                        help="with --postprocess, keep only the earliest forecast of each group of near-duplicates")
+    parser.add_argument("--duplicate-threshold", type=float, default=0.2,
+                        help="minimum estimated Jaccard similarity of the 3-grams of near-duplicate forecasts")
+    parser.add_argument("--duplicate-window-days", type=int, default=7,
+                        help="maximum number of days between the reports of near-duplicate forecasts")
+    parser.add_argument("--batch", choices=["build", "ingest"],
+                        help="build: write Batch API request files; ingest: read Batch API result files into the output")
+    parser.add_argument("--batch-dir", default="data/batch", help="directory of the Batch API request and result files")
+    parser.add_argument("--results", nargs="+", default=None,
+                        help="Batch API result files (glob patterns) to ingest, by default <batch-dir>/results-*.jsonl "
+                             "(<batch-dir>/retry-results-*.jsonl with --resume)")
+    parser.add_argument("--only-failed", action="store_true",
+                        help="with --batch build, write requests only for the custom ids in <batch-dir>/failed.txt")
+    parser.add_argument("--max-requests-per-file", type=int, default=50000)
+    parser.add_argument("--max-file-mb", type=int, default=190)
+
+    group = parser.add_argument_group("settings", "override the settings in forecasting/settings.py")
+    group.add_argument("--backend", choices=["openai", "fake"], default=os.getenv("MODEL_BACKEND", settings.model_backend))
+    group.add_argument("--async", dest="async_mode", action=argparse.BooleanOptionalAction, default=settings.async_mode)
+    group.add_argument("--max-concurrency", type=int, default=settings.max_concurrency)
+    group.add_argument("--requests-per-minute", type=int, default=settings.requests_per_minute)
+    group.add_argument("--tokens-per-minute", type=int, default=settings.tokens_per_minute)
+    group.add_argument("--cache", action=argparse.BooleanOptionalAction, default=settings.use_cache)
+    group.add_argument("--examples-top-k", type=int, default=settings.examples_top_k, help="0 or unset sends all examples")
+    group.add_argument("--prefilter", action=argparse.BooleanOptionalAction, default=settings.use_prefilter)
+    group.add_argument("--packing", action=argparse.BooleanOptionalAction, default=settings.use_packing)
+    group.add_argument("--lenient-validation", action=argparse.BooleanOptionalAction, default=settings.lenient_validation)
+    group.add_argument("--store", default=settings.store_path, help="SQLite forecast store to write to")
+    group.add_argument("--metrics", default=settings.metrics_path, help="per-document metrics JSONL file ('' to disable)")
+    group.add_argument("--prometheus", default=settings.prometheus_path,
+                       help="Prometheus text format file for the run totals")
+
+    fake = parser.add_argument_group("fake model", "options of --backend fake")
+    fake.add_argument("--fake-responses", default=settings.fake_responses_path,
+                      help="forecasts CSV replayed as responses (must not be the --output)")
+    fake.add_argument("--fake-latency", type=float, default=settings.fake_latency, help="median request latency in seconds")
+    fake.add_argument("--fake-latency-sigma", type=float, default=settings.fake_latency_sigma,
+                      help="sigma of the lognormal latency distribution")
+    fake.add_argument("--fake-error-rate", type=float, default=settings.fake_error_rate,
+                      help="share of requests failing with a 429 error")
+    fake.add_argument("--fake-timeout-rate", type=float, default=settings.fake_timeout_rate,
+                      help="share of requests failing with a timeout")
+    fake.add_argument("--fake-invalid-rate", type=float, default=settings.fake_invalid_rate,
+                      help="share of responses with an invalid forecast")
+    fake.add_argument("--fake-seed", type=int, default=settings.fake_seed)
+    return parser
+
+
+def same_file(path, other):
+    if os.path.exists(path) and os.path.exists(other):
+        return os.path.samefile(path, other)
+    return os.path.abspath(path) == os.path.abspath(other)
+
+
+def apply_settings(args):
+    settings.model_backend = args.backend
+    settings.async_mode = args.async_mode
+    settings.max_concurrency = args.max_concurrency
+    settings.requests_per_minute = args.requests_per_minute
+    settings.tokens_per_minute = args.tokens_per_minute
+    settings.use_cache = args.cache
+    settings.examples_top_k = args.examples_top_k or None
+    settings.use_prefilter = args.prefilter
+    settings.use_packing = args.packing
+    settings.lenient_validation = args.lenient_validation
+    settings.store_path = args.store
+    settings.metrics_path = args.metrics or None
+    settings.prometheus_path = args.prometheus
+    settings.fake_responses_path = args.fake_responses
+    settings.fake_latency = args.fake_latency
+    settings.fake_latency_sigma = args.fake_latency_sigma
+    settings.fake_error_rate = args.fake_error_rate
+    settings.fake_timeout_rate = args.fake_timeout_rate
+    settings.fake_invalid_rate = args.fake_invalid_rate
+    settings.fake_seed = args.fake_seed
+
+
+def main(argv=None):
+    # Load from specific path with override, so MODEL_BACKEND in .env sets the default backend
+    load_dotenv(override=True)
+    args = build_parser().parse_args(argv)
+    apply_settings(args)
+
+    # Imported after parsing, so --help does not wait for the pipeline's dependencies
+    from .streaming import merge_shards, shard_path
+
+    if args.merge:
+        paths = [shard_path(args.output, index, args.merge) for index in range(args.merge)]
+        missing = [path for path in paths if not os.path.exists(path)]
+        if missing:
+            raise SystemExit(f"Missing shard output(s): {', '.join(missing)}")
+        count = merge_shards(paths, args.input, args.output)
+        print(f"Merged {count} forecast(s) from {len(paths)} shard(s) into {args.output}.")
+        return
+
+    if args.export:
+        from .store import ForecastStore
+
+        if not settings.store_path:
+            raise SystemExit("--export needs --store (or store_path in forecasting/settings.py).")
+        store = ForecastStore(settings.store_path)
+        count = store.export_csv(args.output)
+        store.close()
+        print(f"Exported {count} forecast(s) from {settings.store_path} to {args.output}.")
+        return
+
+    if args.postprocess:
+        import pandas as pd
+
+        from .postprocess import postprocess
+
+        forecasts = postprocess(
+            pd.read_csv(args.output, dtype={"date_numerical": str}), args.input,
+            threshold=args.duplicate_threshold, window_days=args.duplicate_window_days, collapse=args.collapse,
+        )
+        forecasts.to_csv(args.postprocess, index=False)
+        # Counted from the group sizes, which are kept when the duplicates are dropped
+        duplicates = (forecasts['group_size'] - 1)[~forecasts['is_duplicate']].sum()
+        print(f"Wrote {len(forecasts)} forecast(s) to {args.postprocess}; found {duplicates} near-duplicate(s).")
+        return
+
+    if args.incremental and not settings.store_path:
+        raise SystemExit("--incremental needs --store (or store_path in forecasting/settings.py).")
+
+    from . import pipeline
+
+    output_filename = args.output
+    batch_dir = args.batch_dir
+    if args.shard is not None:
+        output_filename = shard_path(output_filename, *args.shard)
+        # Each shard has its own request, result and failed.txt files
+        batch_dir = shard_path(batch_dir, *args.shard)
+        if settings.metrics_path:
+            settings.metrics_path = shard_path(settings.metrics_path, *args.shard)
+        if settings.prometheus_path:
+            settings.prometheus_path = shard_path(settings.prometheus_path, *args.shard)
+
+    # The fake model's responses are read before the output is opened, but the run would then
+    # overwrite them (by default the extracted forecasts in data/forecasts.csv) with replayed ones
+    fake_run = settings.model_backend == "fake" and args.batch is None
+    if fake_run and same_file(settings.fake_responses_path, output_filename):
+        raise SystemExit(
+            f"--fake-responses {settings.fake_responses_path} is the output of the run; pass another --output."
+        )
+
+    if args.batch == "build":
+        pipeline.build_batch(
+            args.input, batch_dir, only_failed=args.only_failed, chunksize=args.chunksize,
+            max_requests_per_file=args.max_requests_per_file, max_file_mb=args.max_file_mb, shard=args.shard,
+        )
+    elif args.batch == "ingest":
+        pipeline.ingest_batch(output_filename, batch_dir, results=args.results, resume=args.resume)
+    else:
+        pipeline.run(
+            args.input, output_filename, resume=args.resume, chunksize=args.chunksize,
+            flush_every=args.flush_every, shard=args.shard, incremental=args.incremental,
+        )
@@ -0,0 +1,99 @@
+import hashlib
+import json
+import os
+import re
+
+import numpy as np
+
+
+SENTENCE_SPLIT = re.compile(r'(?<=[.!?;])(?<!\bi\.e\.)(?<!\be\.g\.)(?<!\bvs\.)\s+(?=["(A-Z0-9])')
+
+
+def split_sentences(text):
+    return [s for s in SENTENCE_SPLIT.split(str(text)) if s.strip()]
+
+
+def char_ngrams(text, ngram_range=(3, 5)):
+    text = " " + " ".join(str(text).lower().split()) + " "
+    return [text[i:i + n] for n in range(ngram_range[0], ngram_range[1] + 1) for i in range(len(text) - n + 1)]
+
+
+class ExampleIndex:
+    """TF-IDF index over character n-grams of the example forecasts.
+
+    `select` returns the examples most similar to any sentence of a report,
+    always including at least one example of every category.
+    """
+
+    def __init__(self, vocabulary, idf, matrix, categories, ngram_range=(3, 5)):
+        self.vocabulary = vocabulary
+        self.idf = idf
+        self.matrix = matrix
+        self.categories = categories
+        self.ngram_range = ngram_range
+
+    @classmethod
+    def build(cls, texts, categories, ngram_range=(3, 5)):
+        grams = [char_ngrams(text, ngram_range) for text in texts]
+        vocabulary = {gram: i for i, gram in enumerate(sorted({g for doc in grams for g in doc}))}
+        counts = np.zeros((len(texts), len(vocabulary)), dtype=np.float32)
+        for row, doc in enumerate(grams):
+            np.add.at(counts[row], np.array([vocabulary[g] for g in doc], dtype=np.intp), 1)
+        document_frequency = (counts > 0).sum(axis=0)
+        idf = (np.log((1 + len(texts)) / (1 + document_frequency)) + 1).astype(np.float32)
+        return cls(vocabulary, idf, cls._normalize(counts * idf), np.asarray(categories, dtype=str), ngram_range)
+
+    @classmethod
+    def load_or_build(cls, path, texts, categories, ngram_range=(3, 5)):
+        """Load the index from `path` unless the examples changed since it was saved."""
+        fingerprint = hashlib.sha256(
+            json.dumps([list(texts), list(categories), list(ngram_range)], default=str).encode("utf-8")
+        ).hexdigest()
+        if os.path.exists(path):
+            stored = np.load(path, allow_pickle=False)
+            if str(stored["fingerprint"]) == fingerprint:
+                vocabulary = {gram: i for i, gram in enumerate(stored["vocabulary"].tolist())}
+                return cls(vocabulary, stored["idf"], stored["matrix"], stored["categories"], ngram_range)
+        index = cls.build(texts, categories, ngram_range)
+        np.savez_compressed(
+            path,
+            fingerprint=np.array(fingerprint),
+            vocabulary=np.array(sorted(index.vocabulary, key=index.vocabulary.get)),
+            idf=index.idf,
+            matrix=index.matrix,
+            categories=index.categories,
+        )
+        return index
+
+    @staticmethod
+    def _normalize(matrix):
+        norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+        return matrix / np.where(norms == 0, 1, norms)
+
+    def transform(self, texts):
+        counts = np.zeros((len(texts), len(self.vocabulary)), dtype=np.float32)
+        for row, text in enumerate(texts):
+            ids = [self.vocabulary[g] for g in char_ngrams(text, self.ngram_range) if g in self.vocabulary]
+            np.add.at(counts[row], np.array(ids, dtype=np.intp), 1)
+        return self._normalize(counts * self.idf)
+
+    def scores(self, text):
+        """Cosine similarity of each example to its best matching sentence of `text`."""
+        sentences = split_sentences(text) or [str(text)]
+        return (self.transform(sentences) @ self.matrix.T).max(axis=0)
+
+    def select(self, text, k):
+        """Indices of the top-`k` examples for `text`, with every category represented."""
+        scores = self.scores(text)
+        order = np.argsort(-scores, kind="stable")
+        _, first = np.unique(self.categories[order], return_index=True)
+        chosen = list(order[np.sort(first)])
+        chosen_set = set(chosen)
+        for i in order:
+            if len(chosen) >= k:
+                break
+            if i not in chosen_set:
+                chosen.append(i)
+                chosen_set.add(i)
+        # Keep the original order of the examples file
+        return sorted(int(i) for i in chosen)
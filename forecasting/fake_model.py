@@ -0,0 +1,141 @@
+import asyncio
+import hashlib
+import json
+import random
+import re
+import time
+from typing import Any, List, Optional
+
+import httpx
+import pandas as pd
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from openai import APITimeoutError, RateLimitError
+from pydantic import PrivateAttr
+
+
+FORECAST_FIELDS = [
+    "forecast", "economic_category", "direction", "value_numerical_from",
+    "value_numerical_to", "value_unit", "date_numerical", "date_unit"
+]
+
+
+class FakeForecastModel(BaseChatModel):
+    """Local stand-in for ChatOpenAI that replays canned forecasts.
+
+    Tool calls are answered with one of the canned forecast lists, chosen by
+    a hash of the prompt so the same prompt always gets the same forecasts.
+    Packed prompts get one canned list per `<comment id="...">`, and repair
+    prompts get their forecasts back with the invalid fields set to valid
+    values. Latency is drawn from a lognormal distribution around
+    `latency_median` seconds; `error_rate`, `timeout_rate` and `invalid_rate`
+    inject 429 errors, timeouts and invalid forecasts.
+    """
+
+    responses: List[List[dict]]
+    latency_median: float = 0.0
+    latency_sigma: float = 0.5
+    error_rate: float = 0.0
+    timeout_rate: float = 0.0
+    invalid_rate: float = 0.0
+    seed: int = 0
+    requests: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+
+    _rng: random.Random = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+
+    @classmethod
+    def from_forecasts_csv(cls, path, **kwargs):
+        """Canned responses from a forecasts CSV (one per report id), plus an empty response."""
+        df = pd.read_csv(path)
+        responses = [group[FORECAST_FIELDS].to_dict("records") for _, group in df.groupby("id", sort=True)]
+        for response in responses:
+            for forecast in response:
+                forecast["date_numerical"] = str(forecast["date_numerical"])
+        return cls(responses=responses + [[]], **kwargs)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-forecast"
+
+    def bind_tools(self, tools, tool_choice=None, **kwargs):
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], tool_choice=tool_choice, **kwargs)
+
+    def _latency(self):
+        if self.latency_median <= 0:
+            return 0.0
+        return self.latency_median * self._rng.lognormvariate(0, self.latency_sigma)
+
+    def _inject_errors(self):
+        draw = self._rng.random()
+        request = httpx.Request("POST", "https://api.openai.com/v1/chat/completions")
+        if draw < self.error_rate:
+            raise RateLimitError("Rate limit reached (injected)", response=httpx.Response(429, request=request), body=None)
+        if draw < self.error_rate + self.timeout_rate:
+            raise APITimeoutError(request=request)
+
+    def _canned(self, text):
+        digest = int(hashlib.sha256(text.encode("utf-8")).hexdigest(), 16)
+        return [dict(forecast) for forecast in self.responses[digest % len(self.responses)]]
+
+    def _repaired(self, text):
+        forecasts = []
+        for line in text.splitlines():
+            line = line.strip()
+            if not line.startswith('{"forecast"'):
+                continue
+            entry = json.loads(line)
+            forecast = entry["forecast"]
+            for error in entry["errors"]:
+                field = error.split(":", 1)[0]
+                forecast[field] = 0.0 if field.startswith("value_numerical") else "none"
+            forecasts.append(forecast)
+        return forecasts
+
+    def _respond(self, text, tools):
+        if not tools:
+            return AIMessage(content="none")
+        function = tools[0]["function"]
+        packed = "id" in function["parameters"]["properties"]["forecast"]["items"]["properties"]
+        if "validation errors" in text:
+            forecasts = self._repaired(text)
+        elif packed:
+            forecasts = []
+            for doc_id, comment in re.findall(r'<comment id="([^"]+)">\n(.*?)\n</comment>', text, re.DOTALL):
+                forecasts.extend(dict(forecast, id=doc_id) for forecast in self._canned(comment))
+        else:
+            forecasts = self._canned(text)
+        if forecasts and self._rng.random() < self.invalid_rate:
+            forecast = self._rng.choice(forecasts)
+            field, value = self._rng.choice([("value_unit", "%"), ("direction", "no_change"), ("value_numerical_from", -1.0)])
+            forecast[field] = value
+        args = {"forecast": forecasts}
+        input_tokens = len(text) // 4
+        output_tokens = len(json.dumps(args)) // 4
+        self.requests += 1
+        self.prompt_tokens += input_tokens
+        self.completion_tokens += output_tokens
+        return AIMessage(
+            content="",
+            tool_calls=[{"name": function["name"], "args": args, "id": f"call_{self.requests}"}],
+            usage_metadata={"input_tokens": input_tokens, "output_tokens": output_tokens,
+                            "total_tokens": input_tokens + output_tokens},
+        )
+
+    def _generate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self._inject_errors()
+        time.sleep(self._latency())
+        text = "\n".join(str(message.content) for message in messages)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(text, kwargs.get("tools")))])
+
+    async def _agenerate(self, messages, stop: Optional[List[str]] = None, run_manager=None, **kwargs: Any) -> ChatResult:
+        self._inject_errors()
+        await asyncio.sleep(self._latency())
+        text = "\n".join(str(message.content) for message in messages)
+        return ChatResult(generations=[ChatGeneration(message=self._respond(text, kwargs.get("tools")))])
@@ -0,0 +1,745 @@
+import asyncio
+import functools
+import os
+import time
+from collections import Counter
+
+import pandas as pd
+from dotenv import load_dotenv
+from langchain_core.exceptions import OutputParserException
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_core.pydantic_v1 import ValidationError
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from openai import APITimeoutError, RateLimitError
+
+from . import batch, settings
+from .cache import ResponseCache, make_key
+from .example_index import ExampleIndex
+from .fake_model import FakeForecastModel
+from .prefilter import Prefilter
+from .prompts import packed_prompt_template, prompt_template, repair_prompt_template
+from .rate_limit import TokenBucket, backoff_delay
+from .salvage import SalvageStats, repair_inputs, repaired_items, salvage
+from .schema import Forecasts, PackedForecasts
+from .store import ForecastStore
+from .streaming import CheckpointedWriter, read_reports
+from .telemetry import Telemetry
+
+
+# The model, prompts, chains, examples, cache and prefilter are built on first use
+# from the values in `settings` at that time, and reused afterwards.
+
+@functools.lru_cache(maxsize=None)
+def get_model():
+    if settings.model_backend == "fake":
+        return FakeForecastModel.from_forecasts_csv(
+            settings.fake_responses_path,
+            latency_median=settings.fake_latency,
+            latency_sigma=settings.fake_latency_sigma,
+            error_rate=settings.fake_error_rate,
+            timeout_rate=settings.fake_timeout_rate,
+            invalid_rate=settings.fake_invalid_rate,
+            seed=settings.fake_seed,
+        )
+    # Imported here, as langchain_openai takes a while to import
+    from langchain_openai import ChatOpenAI
+
+    # Load from specific path with override
+    load_dotenv(override=True)
+    return ChatOpenAI(
+        model=settings.model_name, openai_api_key=os.getenv("OPENAI_API_KEY"), temperature=settings.temperature
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_prompt():
+    return ChatPromptTemplate.from_template(prompt_template)
+
+
+@functools.lru_cache(maxsize=None)
+def get_packed_prompt():
+    return ChatPromptTemplate.from_template(packed_prompt_template)
+
+
+@functools.lru_cache(maxsize=None)
+def get_repair_prompt():
+    return ChatPromptTemplate.from_template(repair_prompt_template)
+
+
+# The raw model message is kept for the token usage and for salvaging invalid output
+@functools.lru_cache(maxsize=None)
+def get_chain():
+    return get_prompt() | get_model().with_structured_output(Forecasts, include_raw=True)
+
+
+@functools.lru_cache(maxsize=None)
+def get_packed_chain():
+    return get_packed_prompt() | get_model().with_structured_output(PackedForecasts, include_raw=True)
+
+
+@functools.lru_cache(maxsize=None)
+def get_repair_chain(schema):
+    return get_repair_prompt() | get_model().with_structured_output(schema, include_raw=True)
+
+
+@functools.lru_cache(maxsize=None)
+def get_examples_frame():
+    return pd.read_csv(settings.examples_filename, sep=';')
+
+
+@functools.lru_cache(maxsize=None)
+def get_examples():
+    """The few-shot examples as (forecast, classification) pairs."""
+    examples = []
+    for row in get_examples_frame().to_dict("records"):
+        value_numerical_from = float(row['value_numerical_from']) if isinstance(row['value_numerical_from'], (int, float)) else row['value_numerical_from']
+        value_numerical_to = float(row['value_numerical_to']) if isinstance(row['value_numerical_to'], (int, float)) else row['value_numerical_to']
+        date_numerical = str(row['date_numerical'])
+
+        example = (
+            row['forecast'],
+            {
+                "economic_category": row['category'],
+                "direction": row['direction'],
+                "value_numerical_from": value_numerical_from,
+                "value_numerical_to": value_numerical_to,
+                "value_unit": row['value_unit'],
+                "date_numerical": date_numerical,
+                "date_unit": row['date_unit']
+            }
+        )
+        examples.append(example)
+    return examples
+
+
+@functools.lru_cache(maxsize=None)
+def get_example_index():
+    if settings.examples_top_k is None:
+        return None
+    df_examples = get_examples_frame()
+    return ExampleIndex.load_or_build(
+        settings.example_index_path, df_examples['forecast'].tolist(), df_examples['category'].tolist()
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_response_cache():
+    if not settings.use_cache:
+        return None
+    return ResponseCache(
+        settings.cache_path,
+        max_age_days=settings.cache_max_age_days,
+        max_size_mb=settings.cache_max_size_mb,
+        read_only=settings.cache_read_only,
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def get_prefilter():
+    if not settings.use_prefilter:
+        return None
+    return Prefilter(
+        min_score=settings.prefilter_min_score,
+        context=settings.prefilter_context_sentences,
+        max_chunk_chars=settings.max_part_chars,
+    )
+
+
+def estimate_tokens(text):
+    """Rough token count (about 4 characters per token) used for rate limiting."""
+    return len(str(text)) // 4
+
+
+def build_inputs(text):
+    examples = get_examples()
+    example_index = get_example_index()
+    if example_index is not None:
+        examples = [examples[i] for i in example_index.select(text, settings.examples_top_k)]
+    return {"text": text, "examples": examples}
+
+
+def report_parts(text):
+    prefilter = get_prefilter()
+    return [text] if prefilter is None else prefilter.split(text)
+
+
+def print_prefilter_stats():
+    prefilter = get_prefilter()
+    # Requests for skipped reports would have carried the instructions and examples as well
+    fixed_tokens = estimate_tokens(get_prompt().format(**build_inputs("")))
+    # Same 4 characters per token approximation as estimate_tokens
+    input_tokens = prefilter.input_chars // 4
+    kept_tokens = prefilter.kept_chars // 4
+    extra_requests = prefilter.chunks - (prefilter.documents - prefilter.skipped_documents)
+    saved = input_tokens - kept_tokens + fixed_tokens * (prefilter.skipped_documents - extra_requests)
+    print(f"Prefilter: skipped {prefilter.skipped_documents} of {prefilter.documents} report(s) without forecast candidates, "
+          f"sent {kept_tokens} of {input_tokens} report tokens in {prefilter.chunks} part(s), "
+          f"saved about {saved} prompt tokens.")
+
+
+def cache_key(inputs, chat_prompt=None):
+    template = (chat_prompt or get_prompt()).messages[0].prompt.template
+    backend = None
+    if settings.model_backend == "fake":
+        # The fake model's answers depend on the replayed file and the seed, not on the OpenAI model
+        backend = ["fake", os.path.abspath(settings.fake_responses_path), settings.fake_seed]
+    return make_key(template, inputs["examples"], settings.model_name, settings.temperature, inputs["text"], backend)
+
+
+def get_cached(inputs, chat_prompt=None, schema=Forecasts):
+    response_cache = get_response_cache()
+    if response_cache is None:
+        return None
+    payload = response_cache.get(cache_key(inputs, chat_prompt))
+    return schema.parse_obj(payload) if payload is not None else None
+
+
+def put_cached(inputs, response, chat_prompt=None):
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        response_cache.put(cache_key(inputs, chat_prompt), response.dict())
+
+
+def to_records(doc_id, response):
+    return [
+        {
+            "id": doc_id,
+            "forecast": forecast.forecast,
+            "economic_category": forecast.economic_category,
+            "direction": forecast.direction,
+            "value_numerical_from": forecast.value_numerical_from,
+            "value_numerical_to": forecast.value_numerical_to,
+            "value_unit": forecast.value_unit,
+            "date_numerical": forecast.date_numerical,
+            "date_unit": forecast.date_unit
+        }
+        for forecast in response.forecast
+    ]
+
+
+def pack_reports(items):
+    """Group consecutive (doc_id, text) items into packs within the packing budget."""
+    packs = []
+    current = []
+    size = 0
+    for doc_id, text in items:
+        tokens = estimate_tokens(text)
+        if current and (size + tokens > settings.pack_max_tokens or len(current) >= settings.pack_max_reports):
+            packs.append(current)
+            current = []
+            size = 0
+        current.append((doc_id, text))
+        size += tokens
+    if current:
+        packs.append(current)
+    return packs
+
+
+def packed_text(pack):
+    return "\n\n".join(f'<comment id="{doc_id}">\n{text}\n</comment>' for doc_id, text in pack)
+
+
+def packed_label(pack):
+    return "packed request for document IDs " + ", ".join(str(doc_id) for doc_id, text in pack)
+
+
+def split_packed(pack, response):
+    """Split a packed response into the records of each report of the pack."""
+    forecasts = {str(doc_id): [] for doc_id, text in pack}
+    for forecast in response.forecast:
+        if forecast.id in forecasts:
+            forecasts[forecast.id].append(forecast)
+        else:
+            print(f"Dropping forecast with unknown comment id {forecast.id!r}.")
+    return {
+        doc_id: to_records(doc_id, PackedForecasts.construct(forecast=forecasts[str(doc_id)]))
+        for doc_id, text in pack
+    }
+
+
+def plan_chunk(chunk):
+    """Requests for a chunk of reports, in the order of the reports.
+
+    Each request is a pack of (doc_id, text) items: short reports are packed
+    together, other reports are sent one part per request (a pack of one).
+    """
+    packable = []
+    requests = []
+    for doc_id, text in zip(chunk['id'], chunk['text']):
+        report = report_parts(text)
+        if settings.use_packing and len(report) == 1 and estimate_tokens(report[0]) <= settings.pack_max_tokens:
+            packable.append((doc_id, report[0]))
+        else:
+            requests.extend([(doc_id, part)] for part in report)
+    position = {doc_id: index for index, doc_id in enumerate(chunk['id'])}
+    # The sort is stable, so the parts of a report keep their order
+    return sorted(pack_reports(packable) + requests, key=lambda request: position[request[0][0]])
+
+
+class ChunkWriter:
+    """Writes the reports of a chunk in their order, each as soon as it and all reports before it are finished.
+
+    Requests may finish in any order; the records of a report are put
+    together in the order of its requests. A report with a failed request
+    (records None) is not written, so it is not checkpointed either.
+    """
+
+    def __init__(self, chunk, requests, writer):
+        self.ids = list(chunk['id'])
+        self.dates = list(chunk['date']) if 'date' in chunk else [None] * len(self.ids)
+        self.texts = list(chunk['text'])
+        self.writer = writer
+        self.remaining = Counter(doc_id for request in requests for doc_id, text in request)
+        self.records = {doc_id: {} for doc_id in self.ids}
+        self.position = 0
+        # Reports without any request (e.g. left out by the prefilter) may be written right away
+        self.write_finished()
+
+    def done(self, index, request, records):
+        """Add the records (per report id) of request `index`, and write the reports that are now finished."""
+        for doc_id, text in request:
+            self.remaining[doc_id] -= 1
+        for doc_id, doc_records in records.items():
+            self.records[doc_id][index] = doc_records
+        self.write_finished()
+
+    def write_finished(self):
+        while self.position < len(self.ids) and self.remaining[self.ids[self.position]] == 0:
+            doc_id, date, text = self.ids[self.position], self.dates[self.position], self.texts[self.position]
+            self.position += 1
+            parts = self.records[doc_id]
+            if any(part is None for part in parts.values()):
+                telemetry.finish(doc_id, [])
+                self.writer.fail(doc_id)
+                continue
+            records = [record for index in sorted(parts) for record in parts[index]]
+            telemetry.finish(doc_id, records)
+            self.writer.write(doc_id, records, date, text)
+
+
+salvage_stats = SalvageStats()
+# Wall time of every request, including retries, backoff and rate limit waits
+request_latencies = []
+# Replaced by run() with one writing the metrics file of the run; outside a run nothing is recorded
+telemetry = Telemetry(enabled=False)
+
+
+def record_request(doc_ids, result, started):
+    usage = getattr(result["raw"], "usage_metadata", None) or {}
+    telemetry.add(
+        doc_ids,
+        started=started,
+        network=time.perf_counter() - started,
+        requests=1,
+        prompt_tokens=usage.get("input_tokens", 0),
+        completion_tokens=usage.get("output_tokens", 0),
+    )
+
+
+def strict_response(result):
+    if result["parsing_error"] is not None:
+        raise result["parsing_error"]
+    if result["parsed"] is None:
+        raise OutputParserException("No tool call in the model response.")
+    return result["parsed"]
+
+
+def validate_response(result, schema):
+    """Response and the forecasts to repair; with lenient validation, invalid forecasts are salvaged."""
+    if settings.lenient_validation:
+        return salvage(result, schema, salvage_stats)
+    return strict_response(result), []
+
+
+def repair_response(response, failed, schema, doc_ids, label):
+    # A failed repair keeps the salvaged forecasts rather than retrying the whole report
+    repair = call(get_repair_chain(schema), repair_inputs(failed), f"repair of {label}", doc_ids)
+    if repair is None:
+        salvage_stats.dropped += len(failed)
+    else:
+        response.forecast.extend(repaired_items(repair, schema, failed, salvage_stats))
+    return response
+
+
+async def arepair_response(response, failed, schema, doc_ids, label, semaphore, request_bucket, token_bucket):
+    # A failed repair keeps the salvaged forecasts rather than retrying the whole report
+    repair = await acall(
+        get_repair_chain(schema), repair_inputs(failed), f"repair of {label}", doc_ids,
+        semaphore, request_bucket, token_bucket, get_repair_prompt(),
+    )
+    if repair is None:
+        salvage_stats.dropped += len(failed)
+    else:
+        response.forecast.extend(repaired_items(repair, schema, failed, salvage_stats))
+    return response
+
+
+def call(runnable, inputs, label, doc_ids):
+    """Raw result of one request, backing off on rate limits and timeouts; None after too many of them."""
+    attempt = 0
+    while True:
+        try:
+            started = time.perf_counter()
+            result = runnable.invoke(inputs)
+            record_request(doc_ids, result, started)
+            return result
+        except (RateLimitError, APITimeoutError) as e:
+            if attempt == settings.max_backoff_retries:
+                print(f"Skipping {label} after {attempt} rate limit/timeout retries.")
+                return None
+            delay = backoff_delay(attempt)
+            attempt += 1
+            print(f"{type(e).__name__} for {label}. Backing off {delay:.1f}s...")
+            telemetry.add(doc_ids, retries=1)
+            time.sleep(delay)
+
+
+def invoke(runnable, inputs, label, doc_ids, retries=3, schema=Forecasts):
+    started = time.perf_counter()
+    try:
+        return _invoke(runnable, inputs, label, doc_ids, retries, schema)
+    finally:
+        request_latencies.append(time.perf_counter() - started)
+
+
+def _invoke(runnable, inputs, label, doc_ids, retries, schema):
+    while retries > 0:
+        # Invoke the chain for the current text
+        result = call(runnable, inputs, label, doc_ids)
+        if result is None:
+            return None
+        started = time.perf_counter()
+        try:
+            response, failed = validate_response(result, schema)
+        except (ValidationError, OutputParserException) as e:
+            telemetry.add(doc_ids, retries=1)
+            retries -= 1
+            print(f"Validation error: {e}. Retrying {retries} more time(s)...")
+            if retries == 0:
+                print(f"Skipping {label} due to repeated validation errors.")
+            continue
+        finally:
+            telemetry.add(doc_ids, validation=time.perf_counter() - started)
+        # The repair request records its own network time and retries
+        if failed:
+            return repair_response(response, failed, schema, doc_ids, label)
+        return response
+    return None
+
+
+def extract(doc_id, text):
+    """Forecast records of a report, or None when its request failed (see `invoke`)."""
+    started = time.perf_counter()
+    inputs = build_inputs(text)
+    telemetry.add([doc_id], started=started, render=time.perf_counter() - started)
+    response = get_cached(inputs)
+    if response is not None:
+        telemetry.add([doc_id], cache_hits=1)
+    else:
+        response = invoke(get_chain(), inputs, f"document ID {doc_id}", [doc_id])
+        if response is None:
+            return None
+        put_cached(inputs, response)
+    return to_records(doc_id, response)
+
+
+def extract_pack(pack):
+    if len(pack) == 1:
+        return {pack[0][0]: extract(*pack[0])}
+    doc_ids = [doc_id for doc_id, text in pack]
+    started = time.perf_counter()
+    inputs = build_inputs(packed_text(pack))
+    telemetry.add(doc_ids, started=started, render=time.perf_counter() - started)
+    response = get_cached(inputs, get_packed_prompt(), PackedForecasts)
+    if response is not None:
+        telemetry.add(doc_ids, cache_hits=len(doc_ids))
+    else:
+        response = invoke(get_packed_chain(), inputs, packed_label(pack), doc_ids, retries=1, schema=PackedForecasts)
+        if response is None:
+            print("Falling back to one request per report.")
+            return {doc_id: extract(doc_id, text) for doc_id, text in pack}
+        put_cached(inputs, response, get_packed_prompt())
+    return split_packed(pack, response)
+
+
+def process_chunk(chunk, writer):
+    requests = plan_chunk(chunk)
+    chunk_writer = ChunkWriter(chunk, requests, writer)
+    for index, request in enumerate(requests):
+        chunk_writer.done(index, request, extract_pack(request))
+
+
+def skip_unchanged(chunks, store):
+    """Leave out reports already in the store with the same text."""
+    for chunk in chunks:
+        chunk = chunk[~store.unchanged(chunk['id'], chunk['text'])]
+        if len(chunk):
+            yield chunk
+
+
+def process_reports(chunks, writer):
+    for chunk in chunks:
+        process_chunk(chunk, writer)
+
+
+async def ainvoke(runnable, inputs, label, doc_ids, semaphore, request_bucket, token_bucket,
+                  chat_prompt=None, schema=Forecasts, retries=3):
+    started = time.perf_counter()
+    try:
+        return await _ainvoke(runnable, inputs, label, doc_ids, semaphore, request_bucket, token_bucket,
+                              chat_prompt, schema, retries)
+    finally:
+        request_latencies.append(time.perf_counter() - started)
+
+
+async def acall(runnable, inputs, label, doc_ids, semaphore, request_bucket, token_bucket, chat_prompt):
+    """Raw result of one rate-limited request, backing off on rate limits and timeouts; None after too many of them."""
+    attempt = 0
+    while True:
+        async with semaphore:
+            await request_bucket.acquire()
+            tokens = estimate_tokens(chat_prompt.format(**inputs)) + settings.completion_tokens_estimate
+            await token_bucket.acquire(tokens)
+            try:
+                started = time.perf_counter()
+                result = await asyncio.wait_for(
+                    runnable.ainvoke(inputs),
+                    timeout=settings.request_timeout,
+                )
+                record_request(doc_ids, result, started)
+                return result
+            except (RateLimitError, APITimeoutError, asyncio.TimeoutError) as e:
+                if attempt == settings.max_backoff_retries:
+                    print(f"Skipping {label} after {attempt} rate limit/timeout retries.")
+                    return None
+                delay = backoff_delay(attempt)
+                attempt += 1
+                print(f"{type(e).__name__} for {label}. Backing off {delay:.1f}s...")
+                telemetry.add(doc_ids, retries=1)
+        # Back off outside the semaphore so other documents can proceed
+        await asyncio.sleep(delay)
+
+
+async def _ainvoke(runnable, inputs, label, doc_ids, semaphore, request_bucket, token_bucket,
+                   chat_prompt, schema, retries):
+    chat_prompt = chat_prompt or get_prompt()
+    while retries > 0:
+        result = await acall(runnable, inputs, label, doc_ids, semaphore, request_bucket, token_bucket, chat_prompt)
+        if result is None:
+            return None
+        started = time.perf_counter()
+        try:
+            response, failed = validate_response(result, schema)
+        except (ValidationError, OutputParserException) as e:
+            telemetry.add(doc_ids, retries=1)
+            retries -= 1
+            print(f"Validation error: {e}. Retrying {retries} more time(s)...")
+            if retries == 0:
+                print(f"Skipping {label} due to repeated validation errors.")
+            continue
+        finally:
+            telemetry.add(doc_ids, validation=time.perf_counter() - started)
+        # The repair request happens outside the semaphore, which it acquires again, and records its own
+        # network time and retries
+        if failed:
+            return await arepair_response(response, failed, schema, doc_ids, label, semaphore, request_bucket,
+                                          token_bucket)
+        return response
+    return None
+
+
+async def aextract(doc_id, text, semaphore, request_bucket, token_bucket):
+    started = time.perf_counter()
+    inputs = build_inputs(text)
+    telemetry.add([doc_id], started=started, render=time.perf_counter() - started)
+    response = get_cached(inputs)
+    if response is not None:
+        telemetry.add([doc_id], cache_hits=1)
+    else:
+        response = await ainvoke(
+            get_chain(), inputs, f"document ID {doc_id}", [doc_id], semaphore, request_bucket, token_bucket
+        )
+        if response is None:
+            return None
+        put_cached(inputs, response)
+    return to_records(doc_id, response)
+
+
+async def aextract_pack(pack, semaphore, request_bucket, token_bucket):
+    if len(pack) == 1:
+        return {pack[0][0]: await aextract(*pack[0], semaphore, request_bucket, token_bucket)}
+    doc_ids = [doc_id for doc_id, text in pack]
+    started = time.perf_counter()
+    inputs = build_inputs(packed_text(pack))
+    telemetry.add(doc_ids, started=started, render=time.perf_counter() - started)
+    response = get_cached(inputs, get_packed_prompt(), PackedForecasts)
+    if response is not None:
+        telemetry.add(doc_ids, cache_hits=len(doc_ids))
+    else:
+        response = await ainvoke(
+            get_packed_chain(), inputs, packed_label(pack), doc_ids, semaphore, request_bucket, token_bucket,
+            chat_prompt=get_packed_prompt(), schema=PackedForecasts, retries=1,
+        )
+        if response is None:
+            print("Falling back to one request per report.")
+            per_document = await asyncio.gather(*(
+                aextract(doc_id, text, semaphore, request_bucket, token_bucket) for doc_id, text in pack
+            ))
+            return {doc_id: records for (doc_id, text), records in zip(pack, per_document)}
+        put_cached(inputs, response, get_packed_prompt())
+    return split_packed(pack, response)
+
+
+async def aprocess_chunk(chunk, writer, semaphore, request_bucket, token_bucket):
+    requests = plan_chunk(chunk)
+    chunk_writer = ChunkWriter(chunk, requests, writer)
+
+    async def extract_request(index, request):
+        return index, request, await aextract_pack(request, semaphore, request_bucket, token_bucket)
+
+    # Requests are extracted in parallel; reports are written in order as soon as they are finished
+    for finished in asyncio.as_completed([extract_request(index, request) for index, request in enumerate(requests)]):
+        chunk_writer.done(*await finished)
+
+
+async def aprocess_reports(chunks, writer):
+    semaphore = asyncio.Semaphore(settings.max_concurrency)
+    request_bucket = TokenBucket(settings.requests_per_minute)
+    token_bucket = TokenBucket(settings.tokens_per_minute)
+    for chunk in chunks:
+        await aprocess_chunk(chunk, writer, semaphore, request_bucket, token_bucket)
+
+
+def batch_requests(chunks, only_ids=None):
+    """Batch API requests for all report parts, or only for the custom ids in `only_ids`."""
+    tool = convert_to_openai_tool(Forecasts)
+    roles = {"human": "user", "ai": "assistant", "system": "system"}
+    for chunk in chunks:
+        for doc_id, text in zip(chunk['id'], chunk['text']):
+            for part_index, part in enumerate(report_parts(text)):
+                custom_id = batch.make_custom_id(doc_id, part_index)
+                if only_ids is not None and custom_id not in only_ids:
+                    continue
+                messages = [
+                    {"role": roles[message.type], "content": message.content}
+                    for message in get_prompt().format_messages(**build_inputs(part))
+                ]
+                yield batch.request_line(custom_id, messages, settings.model_name, settings.temperature, tool)
+
+
+def parse_batch_result(doc_id, arguments):
+    return to_records(doc_id, Forecasts.parse_obj(arguments))
+
+
+forecast_columns = [
+    "id", "forecast", "economic_category", "direction", "value_numerical_from",
+    "value_numerical_to", "value_unit", "date_numerical", "date_unit"
+]
+
+def build_batch(input_path=None, batch_dir="data/batch", only_failed=False, chunksize=1000,
+                max_requests_per_file=50000, max_file_mb=190, shard=None):
+    """Write Batch API request files for the reports in `input_path` to `batch_dir`.
+
+    With `shard=(index, count)` only the reports of that shard are included
+    (see `streaming.read_reports`).
+    """
+    failed_filename = os.path.join(batch_dir, "failed.txt")
+    only_ids = None
+    prefix = "requests"
+    if only_failed:
+        with open(failed_filename, encoding="utf-8") as f:
+            only_ids = {line.strip() for line in f if line.strip()}
+        prefix = "retry"
+    paths = batch.build_requests(
+        batch_requests(read_reports(input_path or settings.filename, chunksize, shard=shard), only_ids),
+        batch_dir,
+        prefix=prefix,
+        max_lines=max_requests_per_file,
+        max_bytes=max_file_mb * 1024 * 1024,
+    )
+    print(f"Wrote {len(paths)} request file(s): {', '.join(paths)}")
+
+
+def ingest_batch(output_path=None, batch_dir="data/batch", results=None, resume=False):
+    """Read Batch API result files (glob patterns, by default `<batch_dir>/results-*.jsonl`) into `output_path`.
+
+    With `resume`, the results of re-submitted requests (by default
+    `<batch_dir>/retry-results-*.jsonl`) are appended to the existing output.
+    """
+    output_path = output_path or settings.output_filename
+    failed_filename = os.path.join(batch_dir, "failed.txt")
+    # With resume the results are those of re-submitted requests, appended to the existing output
+    request_prefix = "retry" if resume else "requests"
+    result_prefix = "retry-results" if resume else "results"
+    result_paths = batch.expand_paths(results or [os.path.join(batch_dir, f"{result_prefix}-*.jsonl")])
+    request_paths = batch.expand_paths([os.path.join(batch_dir, f"{request_prefix}-*.jsonl")])
+    succeeded, failed = batch.ingest_results(
+        result_paths, parse_batch_result, output_path, forecast_columns, failed_filename,
+        request_paths=request_paths, append=resume,
+    )
+    print(f"Ingested {succeeded} request(s), {failed} failed (listed in {failed_filename}).")
+
+
+def run(input_path=None, output_path=None, resume=False, chunksize=1000, flush_every=50, shard=None,
+        incremental=False):
+    """Extract the forecasts of the reports in `input_path` into `output_path`.
+
+    With `shard=(index, count)` only the reports of that shard are processed
+    (see `streaming.read_reports`). With `resume`, reports listed in the
+    checkpoint file next to the output are skipped and the output is appended to.
+    With `incremental`, reports already in the forecast store (`settings.store_path`)
+    with the same text are skipped and the output only gets the new and changed reports;
+    the store holds the forecasts of all reports.
+    """
+    global telemetry
+    if incremental and not settings.store_path:
+        raise ValueError("incremental needs a forecast store (settings.store_path)")
+    output_path = output_path or settings.output_filename
+    checkpoint_path = os.path.splitext(output_path)[0] + '.checkpoint'
+    telemetry = Telemetry(
+        settings.metrics_path, settings.input_price_per_million, settings.output_price_per_million, append=resume
+    )
+    # Built before the output is opened (and truncated), so a model that fails to load leaves it intact
+    get_model()
+    store = ForecastStore(settings.store_path, batch_size=flush_every) if settings.store_path else None
+    writer = CheckpointedWriter(
+        output_path, checkpoint_path, forecast_columns,
+        resume=resume, flush_every=flush_every, store=store,
+    )
+    chunks = read_reports(input_path or settings.filename, chunksize, skip_ids=writer.done, shard=shard)
+    if incremental:
+        chunks = skip_unchanged(chunks, store)
+    if writer.done:
+        print(f"Resuming: skipping {len(writer.done)} completed document(s).")
+
+    try:
+        if settings.async_mode:
+            asyncio.run(aprocess_reports(chunks, writer))
+        else:
+            process_reports(chunks, writer)
+    finally:
+        writer.close()
+        if store is not None:
+            store.close()
+
+    if writer.failed:
+        print(f"{len(writer.failed)} document(s) failed and were not checkpointed; run with --resume to retry them.")
+
+    if get_prefilter() is not None:
+        print_prefilter_stats()
+
+    if settings.lenient_validation:
+        print(salvage_stats.summary())
+
+    print(telemetry.summary())
+    if settings.prometheus_path:
+        telemetry.write_prometheus(settings.prometheus_path)
+    telemetry.close()
+
+    response_cache = get_response_cache()
+    if response_cache is not None:
+        stats = response_cache.stats()
+        print(f"Cache hits: {stats['hits']}, misses: {stats['misses']}")
+        response_cache.evict()
+        response_cache.close()
+        get_response_cache.cache_clear()
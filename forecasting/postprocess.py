@@ -0,0 +1,220 @@
+import numpy as np
+import pandas as pd
+
+
+# Allowed values of the enum fields, as in the validators of schema.Classification
+CATEGORIES = {
+    "economic_category": ["CPI", "MS", "W", "E", "IO", "PPI", "RS", "EURPLN", "UR", "PMI", "IR", "none"],
+    "direction": ["positive", "negative", "zero", "increase", "decrease", "no change", "none"],
+    "value_unit": ["%y/y", "%m/m", "pt", "pp", "pb", "%", "other", "none"],
+    "date_numerical": ["1", "2", "3", "4", "5", "6", "7", "8", "9", "10", "11", "12", "today", "other", "none"],
+    "date_unit": ["month", "day", "other", "none"],
+}
+
+# Plausible range of the EUR/PLN exchange rate, as in the field description
+EURPLN_RANGE = (3.0, 5.0)
+
+# Columns a forecast must share with another to be its near-duplicate
+DUPLICATE_KEY = ["economic_category", "value_unit", "date_numerical", "value_numerical_from", "value_numerical_to"]
+
+
+def normalize(df):
+    """Copy of a forecasts DataFrame with normalized values and categorical enum fields.
+
+    - inverted ranges (value_numerical_from > value_numerical_to) are swapped
+    - basis points (pb) are converted to percentage points (pp)
+    - EURPLN values outside EURPLN_RANGE are set to NaN
+    - the enum fields get categorical dtypes; values outside CATEGORIES become NaN
+    """
+    df = df.copy()
+    low = df["value_numerical_from"].to_numpy(dtype=float)
+    high = df["value_numerical_to"].to_numpy(dtype=float)
+    low, high = np.fmin(low, high), np.fmax(low, high)
+
+    unit = df["value_unit"].astype(str).to_numpy()
+    basis_points = unit == "pb"
+    low = np.where(basis_points, low / 100, low)
+    high = np.where(basis_points, high / 100, high)
+    unit = np.where(basis_points, "pp", unit)
+
+    eurpln = df["economic_category"].astype(str).to_numpy() == "EURPLN"
+    low = np.where(eurpln & ((low < EURPLN_RANGE[0]) | (low > EURPLN_RANGE[1])), np.nan, low)
+    high = np.where(eurpln & ((high < EURPLN_RANGE[0]) | (high > EURPLN_RANGE[1])), np.nan, high)
+
+    df["value_numerical_from"] = low
+    df["value_numerical_to"] = high
+    df["value_unit"] = unit
+    # date_numerical is read as a number when a file has only months in it
+    df["date_numerical"] = df["date_numerical"].astype(str).str.replace(r"\.0$", "", regex=True)
+    for column, categories in CATEGORIES.items():
+        df[column] = pd.Categorical(df[column].astype(str), categories=categories)
+    return df
+
+
+def attach_report_dates(df, reports_filename, chunksize=100000):
+    """Add the date of each forecast's report (from the reports CSV) as a `report_date` column."""
+    dates = pd.concat(
+        chunk for chunk in pd.read_csv(reports_filename, sep=';', usecols=['id', 'date'], dtype=str, chunksize=chunksize)
+    ).drop_duplicates('id')
+    dates = pd.Series(pd.to_datetime(dates['date'], format="%d.%m.%Y", errors="coerce").to_numpy(), index=dates['id'])
+    df = df.copy()
+    df["report_date"] = dates.reindex(df["id"].astype(str)).to_numpy()
+    return df
+
+
+def shingle_hashes(texts, k):
+    """32-bit hashes of the character k-grams of each text, flattened, and the offset of each text's first hash.
+
+    Texts shorter than k get a single shingle (padded with zeros). All texts
+    are encoded into one array of code points, so there is no loop over texts.
+    """
+    lengths = texts.str.len().to_numpy()
+    # Each text is followed by k - 1 zeros, so no shingle spans two texts
+    codes = np.frombuffer(("\0" * (k - 1)).join(texts.tolist()).encode("utf-32-le"), dtype=np.uint32)
+    codes = np.concatenate([codes, np.zeros(k - 1, dtype=np.uint32)]).astype(np.uint64)
+    text_starts = np.concatenate([[0], np.cumsum(lengths + k - 1)[:-1]])
+    counts = np.maximum(lengths - k + 1, 1)
+    offsets = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    positions = np.repeat(text_starts - offsets, counts) + np.arange(counts.sum())
+    hashes = np.zeros(len(positions), dtype=np.uint64)
+    with np.errstate(over="ignore"):
+        for j in range(k):
+            hashes = hashes * np.uint64(1000003) + codes[positions + j]
+        # splitmix64 finalizer, so similar shingles get unrelated hashes
+        hashes ^= hashes >> np.uint64(30)
+        hashes *= np.uint64(0xBF58476D1CE4E5B9)
+        hashes ^= hashes >> np.uint64(27)
+        hashes *= np.uint64(0x94D049BB133111EB)
+        hashes ^= hashes >> np.uint64(31)
+    return hashes.astype(np.uint32), offsets
+
+
+def minhash(texts, num_perm=64, k=3, seed=0, batch_size=100000):
+    """MinHash signatures (rows x num_perm) of the character k-gram sets of `texts`.
+
+    The share of equal signature entries of two texts estimates the Jaccard
+    similarity of their k-gram sets.
+    """
+    texts = pd.Series(texts, dtype=object).fillna("").astype(str)
+    texts = texts.str.lower().str.replace(r"\s+", " ", regex=True).str.strip()
+    rng = np.random.default_rng(seed)
+    # (x ^ b) * a (mod 2^32) with an odd a is a permutation of the 32-bit hashes
+    a = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint32) | np.uint32(1)
+    b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint32)
+    signatures = np.empty((len(texts), num_perm), dtype=np.uint32)
+    for start in range(0, len(texts), batch_size):
+        hashes, offsets = shingle_hashes(texts.iloc[start:start + batch_size], k)
+        permuted = np.empty_like(hashes)
+        for i in range(num_perm):
+            np.bitwise_xor(hashes, b[i], out=permuted)
+            np.multiply(permuted, a[i], out=permuted)
+            signatures[start:start + len(offsets), i] = np.minimum.reduceat(permuted, offsets)
+    return signatures
+
+
+def connected_labels(n, left, right):
+    """Label of each of `n` nodes: the smallest node index of its connected component."""
+    labels = np.arange(n)
+    if len(left) == 0:
+        return labels
+    while True:
+        smallest = np.minimum(labels[left], labels[right])
+        updated = labels.copy()
+        np.minimum.at(updated, left, smallest)
+        np.minimum.at(updated, right, smallest)
+        # Pointer jumping, so long chains converge in a logarithmic number of rounds
+        updated = updated[updated]
+        if np.array_equal(updated, labels):
+            return labels
+        labels = updated
+
+
+def find_duplicates(df, threshold=0.2, window_days=7, num_perm=64, k=3, max_lag=1000, pair_batch_size=1000000):
+    """Copy of `df` with near-duplicate forecasts marked.
+
+    Two forecasts are near-duplicates when they have the same DUPLICATE_KEY,
+    their reports are at most `window_days` apart (the same report included;
+    without a `report_date` column only forecasts of the same report are
+    compared) and the estimated Jaccard similarity of the character k-grams
+    of their texts is at least `threshold`. Near-duplicates are grouped
+    transitively: `duplicate_group` is the row position of the earliest
+    forecast of the group, `group_size` its number of forecasts, and
+    `is_duplicate` marks every forecast but the earliest.
+
+    The default threshold is low because the key already has to match: the
+    same call restated in other words shares about 0.2-0.4 of its 3-grams,
+    while unrelated forecasts share about 0.1.
+
+    Candidate pairs are the rows up to `max_lag` apart after sorting by key and
+    report date, found one lag at a time, so the work grows with the number of
+    rows times the number of forecasts with the same key within a window.
+    MinHash signatures are only computed for forecasts in a candidate pair.
+    """
+    n = len(df)
+    if "report_date" in df:
+        days = pd.to_datetime(df["report_date"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+        days = np.where(pd.isna(df["report_date"]).to_numpy(), np.iinfo(np.int64).min, days)
+        window = window_days
+    else:
+        days = np.zeros(n, dtype=np.int64)
+        window = 0
+    # Without report dates, the report id keeps forecasts of different reports apart
+    key_columns = DUPLICATE_KEY if "report_date" in df else DUPLICATE_KEY + ["id"]
+    key_codes = df.groupby(key_columns, sort=False, dropna=False, observed=True).ngroup().to_numpy()
+    order = np.lexsort((np.arange(n), days, key_codes))
+    sorted_keys = key_codes[order]
+    sorted_days = days[order]
+    has_date = sorted_days != np.iinfo(np.int64).min
+
+    # Candidate pairs (positions in the sorted order): same key, reports within the window
+    left = []
+    right = []
+    for lag in range(1, min(max_lag, n - 1) + 1):
+        candidate = (sorted_keys[lag:] == sorted_keys[:-lag]) & has_date[lag:] & has_date[:-lag]
+        candidate &= sorted_days[lag:] - sorted_days[:-lag] <= window
+        # Rows are sorted by date within a key, so larger lags have no candidates either
+        if not candidate.any():
+            break
+        index = np.flatnonzero(candidate)
+        left.append(index)
+        right.append(index + lag)
+    left = np.concatenate(left) if left else np.array([], dtype=np.intp)
+    right = np.concatenate(right) if right else np.array([], dtype=np.intp)
+
+    # Signatures are only computed for forecasts in a candidate pair
+    rows = np.unique(np.concatenate([left, right]))
+    signatures = minhash(df["forecast"].to_numpy()[order[rows]], num_perm=num_perm, k=k)
+    left_rows = np.searchsorted(rows, left)
+    right_rows = np.searchsorted(rows, right)
+    similar = np.zeros(len(left), dtype=bool)
+    # In batches of pairs, to bound the memory of the signature comparison
+    for start in range(0, len(left), pair_batch_size):
+        batch = slice(start, start + pair_batch_size)
+        equal = signatures[left_rows[batch]] == signatures[right_rows[batch]]
+        similar[batch] = equal.mean(axis=1) >= threshold
+    left = left[similar]
+    right = right[similar]
+    # Labels are positions in the sorted order, where the earliest forecast of a group comes first
+    labels = connected_labels(n, left, right)
+    groups = np.empty(n, dtype=np.int64)
+    groups[order] = order[labels]
+    df = df.copy()
+    df["duplicate_group"] = groups
+    df["group_size"] = np.bincount(groups, minlength=n)[groups]
+    df["is_duplicate"] = groups != np.arange(n)
+    return df
+
+
+def postprocess(df, reports_filename=None, threshold=0.2, window_days=7, collapse=False):
+    """Normalize a forecasts DataFrame and mark its near-duplicates (see `normalize` and `find_duplicates`).
+
+    With `reports_filename`, forecasts of different reports are compared
+    within `window_days` of their report dates; otherwise only forecasts
+    of the same report are. With `collapse`, only the earliest forecast of
+    each group of near-duplicates is kept.
+    """
+    df = normalize(df.reset_index(drop=True))
+    if reports_filename is not None:
+        df = attach_report_dates(df, reports_filename)
+    df = find_duplicates(df, threshold=threshold, window_days=window_days)
+    return df[~df["is_duplicate"].to_numpy()] if collapse else df
@@ -0,0 +1,110 @@
+import re
+
+from .example_index import split_sentences
+
+
+MONTHS = (
+    "january|february|march|april|may|june|july|august|september|october|november|december|"
+    "jan|feb|mar|apr|jun|jul|aug|sep|sept|oct|nov|dec"
+)
+
+# Feature name -> (pattern, weight); a sentence scores the weights of the patterns it matches
+FEATURES = {
+    "author": (re.compile(
+        r"\b(we expect|we forecast|we anticipate|we estimate|we predict|we see|we will|we believe|"
+        r"our forecast|our estimate|in our opinion|in our view)\b",
+        re.IGNORECASE), 3),
+    "future": (re.compile(
+        r"\b(will|should|is expected|are expected|expected to|likely|probably|forecast|projected|"
+        r"outlook|next (?:week|month|quarter|year))\b",
+        re.IGNORECASE), 2),
+    "value": (re.compile(r"\d+(?:[.,]\d+)?\s*(?:%|percent|pp\b|pb\b|bp\b|bps\b|basis points?|points?\b)", re.IGNORECASE), 2),
+    "unit": (re.compile(r"%\s*(?:y/y|m/m|q/q)|\b(?:y/y|m/m|yoy|mom)\b", re.IGNORECASE), 1),
+    "eurpln": (re.compile(r"\bEUR\s*/?\s*PLN\b|\b[34][.,]\d{2}(?:\s*-\s*[34][.,]\d{2})?\b", re.IGNORECASE), 2),
+    "month": (re.compile(rf"\b(?:{MONTHS})\b|\bQ[1-4]\b|\b(?:19|20)\d{{2}}\b", re.IGNORECASE), 1),
+}
+
+
+def score_sentence(sentence):
+    return sum(weight for pattern, weight in FEATURES.values() if pattern.search(sentence))
+
+
+class Prefilter:
+    """Keeps only the parts of a report that may contain forecasts.
+
+    Sentences are scored with regex features (forecast and future tense cues,
+    numeric values and units, EURPLN quotes, months). Sentences with at least
+    `min_score` points, together with `context` neighbouring sentences on each
+    side, form candidate windows. Windows are packed into chunks of at most
+    `max_chunk_chars` characters. A report without candidates yields no chunks.
+    """
+
+    def __init__(self, min_score=4, context=1, max_chunk_chars=12000):
+        self.min_score = min_score
+        self.context = context
+        self.max_chunk_chars = max_chunk_chars
+        self.documents = 0
+        self.skipped_documents = 0
+        self.chunks = 0
+        self.input_chars = 0
+        self.kept_chars = 0
+
+    def windows(self, sentences):
+        """Runs of consecutive candidate sentences (with their context), as lists of sentences."""
+        keep = [False] * len(sentences)
+        for i, sentence in enumerate(sentences):
+            if score_sentence(sentence) >= self.min_score:
+                for j in range(max(0, i - self.context), min(len(sentences), i + self.context + 1)):
+                    keep[j] = True
+        windows = []
+        current = []
+        for sentence, kept in zip(sentences, keep):
+            if kept:
+                current.append(sentence)
+            elif current:
+                windows.append(current)
+                current = []
+        if current:
+            windows.append(current)
+        return windows
+
+    def pieces(self, window):
+        """Split a window into pieces of at most `max_chunk_chars` characters at sentence boundaries.
+
+        A single sentence longer than that is cut at the last space before the limit.
+        """
+        pieces = []
+        current = ""
+        for sentence in window:
+            while len(sentence) > self.max_chunk_chars:
+                cut = sentence.rfind(" ", 0, self.max_chunk_chars + 1)
+                cut = cut if cut > 0 else self.max_chunk_chars
+                pieces.append(sentence[:cut])
+                sentence = sentence[cut:].lstrip()
+            if current and len(current) + len(sentence) + 1 > self.max_chunk_chars:
+                pieces.append(current)
+                current = ""
+            current = f"{current} {sentence}" if current else sentence
+        if current:
+            pieces.append(current)
+        return pieces
+
+    def split(self, text):
+        """Return the candidate chunks of `text` to be sent to the model."""
+        chunks = []
+        current = ""
+        for window in self.windows(split_sentences(text)):
+            for piece in self.pieces(window):
+                if current and len(current) + len(piece) + 5 > self.max_chunk_chars:
+                    chunks.append(current)
+                    current = ""
+                current = f"{current}\n...\n{piece}" if current else piece
+        if current:
+            chunks.append(current)
+
+        self.documents += 1
+        self.skipped_documents += not chunks
+        self.chunks += len(chunks)
+        self.input_chars += len(str(text))
+        self.kept_chars += sum(len(chunk) for chunk in chunks)
+        return chunks
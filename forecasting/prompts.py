@@ -0,0 +1,88 @@
+# Define the combined prompt for extracting, classifying, and quantifying forecasts
+prompt_template = (
+    """"
+    You are an experienced economist. Your task is to analyze the market commentary and extract forecasts on the future development of Polish economic and financial data. The forecasts should be short, specific and refer only to the future.
+
+    Criteria for forecasts:
+    - They relate only to the future: each forecast must contain information about anticipated changes, and not describe current or past states.
+    - They have a specific value (e.g., “increase by 5%”, “decrease by 0.5 percentage points”, “will be 12% on an annual basis”, “in the range of 3.40 - 3.45”).
+    - Classify by economic criteria and time periods (e.g., monthly, daily).
+    - Forecasts must be clearly attributed to the author of the commentary and not to other individuals or organizations quoted in the text.
+    - Contain future tense wording, e.g., “will increase,” “will decrease,” “will stay level,” “will reach.”
+    - Are verifiable in a specific time frame (e.g., “in July”, “by the end of the year”).
+
+    When classifying a text as a forecast, pay attention to the subtle difference between a reflection and a forecast. Example: “Taking further measures by the NBP to counteract the deceleration of economic growth in Poland” is not a forecast, but a reflection.
+
+    For each forecast, based on the context of the commentary, identify:
+    - The author of the forecast (Author of the commentary on the economic and market situation, the organization presenting the commentary, another person or organization).
+    - The economic category of the forecast (economic_category): CPI, MS, W, E, IO, PPI, RS, EURPLN, UR, PMI, IR or none, where:
+        - PPI: when the forecast is for the annual (%y/y) or monthly (%m/m) dynamics of producer price inflation (PPI), also referred to as producer price inflation, in Poland, or when no country is indicated
+        - CPI: annual (%y/y)or monthly (%m/m) consumer price inflation (CPI) dynamics in Poland or when no country is indicated. 
+        - IO: when the forecast is for annual (%y/y) or monthly (%m/m) industrial production dynamics in Poland or when no other country is indicated. 
+        - RS: when the forecast is for annual (%y/y) or monthly (%m/m) retail sales growth in Poland in nominal terms, or no country is indicated
+        - MS: when the forecast is for annual (%y/y) or monthly (%m/m) money supply in Poland, or no country is indicated.
+        - W: when the forecast is for annual (%y/y) or monthly (%m/m) nominal wage growth in Poland, or no country is indicated.
+        - E: when the forecast is for annual (%y/y) or monthly (%m/m) employment growth in Poland or no country is indicated. 
+        - EURPLN: when the forecast is for the PLN/Euro exchange rate.
+        - UR: when the forecast is for the registered unemployment rate in Poland or no country is indicated.
+        - PMI: when the forecast is for the PMI index for Poland.
+        - IR: when the forecast is for the National Bank of Poland (NBP) base interest rate as determined by the MPC.
+        - None: when the forecast does not apply to any of the above categories or applies to the relationship of an economic indicator to another indicator. 
+    - The direction of the forecast (direction): increase, decrease, no_change, none for the EURPLN, IR, PMI and UR economic categories; or the sign of the forecast (direction): positive, negative, zero for the other economic categories.
+    - The numerical value of the forecast (value_numerical): e.g. 5.8 for a point forecast, or the upper/lower ranges of values for the forecast, e.g. 3.5 - 3.6. Always provide an absolute value for the numerical value of the pronosis.
+    - The unit of measure of the forecast value (value_unit): only “%y/y” (meaning year-to-year percentage), “%m/m” (meaning month-to-month percentage), “pt” (meaning percentage point, “pb” meaning base point or “none”.
+    - Forecast date (date_numerical): e.g. 1, 2, 3, 4, 5, 6, 7, 8, 9, 10, 11, 12, other, none.
+    - The unit of measure of the forecast date (date_unit): day, month, quarter, other, none.
+
+    Important: forecast information should be consistent with and based on the context of the commentary. 
+    
+    ---
+    Present forecasts only to the author of the commentary:
+    For each forecast, deduce from its context whether its author is the Author of the stock market commentary or the organization presenting the commentary, or another person or organization. This is very important: forecasts should be authored by the analyst or organization presenting the commentary.
+    The fact that the forecast that is authored by the Author of the commentary or his organization is indicated by phrases such as “Our forecast is ...”, “In our opinion ...”, “We expect ...”, or other similar phrases.
+    If the author of the forecast is not the Author of the commentary or the organization presenting the commentary, or you are not sure whether the forecast is authored by the analyst, do not present it in the results.
+    An example of a forecast whose author is not the Author of the commentary: “Labor Minister Jolanta Fedak said she believes Poland's unemployment rate will fall to 10% in 2016.”, ”According to the CSO's report, consumer price dynamics will be 0.5% m/m in June.” “According to its forecast, Poland's GDP will grow by 3.5% y/y in 2016.”
+    ---
+    Provide forecasts only for the future:
+    Your commentary can include information about the past, present and future. Present only forecasts that relate to the future. Forecasts relating to the past or present should not be included in the results.
+    Examples of forecasts concerning the past: “In June, inflation in Poland was 0.5% m/m,” ‘Annual production growth slowed to 5.8% from 13.9% in December,’ ”According to our estimates, due to the seasonality of labor demand, the registered unemployment rate reached 20.4% in January compared to 20% at the end of last year.”
+    ---
+    Present forecasts with their context:
+    Present forecasts with their context, in complete sentences, so that they can be understood by the audience. Context can help you understand the forecast and its classification. DO NOT present forecasts without context. Example of a forecast without context: “up to 2.5%2.8% in the second half of the year”, “will fall to below 19% at the end of the year”, “will increase in the fourth quarter.”
+    ---
+    Present verifiable forecasts:
+    Present forecasts that can be verified in the future by comparing them with actual (numerical) economic data. Forecasts that cannot be verified should not be included in the results. Example of a verifiable forecast: “We expect industrial production to grow by 3.5% y/y in May.”
+    ---
+    Below you will find examples of forecasts that can be extracted from the commentary, along with their classification. In some examples, a specific forecast date (date_numerical) or value (value_numerical_from and value_numerical_to) is given even though it does not appear in the forecast text, but is implied by the context (the whole text).
+    {examples}
+
+    Here's a comment:
+    {text}
+
+    Extract only forecasts that can be verified in the future by comparing them with actual economic data, and classify them according to the guidelines above. If you have not identified any forecasts, return “none.”
+    """
+)
+
+# Prompt for several comments packed into one request, each marked with its id
+packed_prompt_template = prompt_template.replace(
+    """
+    Here's a comment:
+    {text}
+""",
+    """
+    Here are several comments, each enclosed in <comment id="..."> tags:
+    {text}
+
+    Extract the forecasts of each comment separately and return for each forecast the id of the comment it comes from.
+"""
+)
+
+# Prompt for repairing forecasts that failed validation
+repair_prompt_template = (
+    """
+    The forecasts below were extracted from a market commentary, but some of their fields have invalid values. Each line contains a forecast and its validation errors:
+    {items}
+
+    Return the same forecasts, in the same order, with the invalid fields corrected according to the field descriptions. Do not add or remove forecasts.
+    """
+)
@@ -0,0 +1,140 @@
+import json
+from collections import Counter
+
+from langchain_core.exceptions import OutputParserException
+from langchain_core.pydantic_v1 import ValidationError
+
+
+# Known near-misses of the model, mapped to the values allowed by the validators
+NEAR_MISSES = {
+    "direction": {
+        "no_change": "no change", "no-change": "no change", "nochange": "no change", "unchanged": "no change",
+        "stable": "no change", "up": "increase", "down": "decrease", "rise": "increase", "fall": "decrease",
+    },
+    "value_unit": {
+        "% y/y": "%y/y", "%yy": "%y/y", "y/y": "%y/y", "%yoy": "%y/y", "% yoy": "%y/y", "yoy": "%y/y",
+        "% m/m": "%m/m", "%mm": "%m/m", "m/m": "%m/m", "%mom": "%m/m", "% mom": "%m/m", "mom": "%m/m",
+        "bp": "pb", "bps": "pb", "basis points": "pb", "p.p.": "pp", "pts": "pt", "points": "pt",
+    },
+    "date_unit": {"months": "month", "days": "day"},
+}
+
+ENUM_FIELDS = ["economic_category", "direction", "value_unit", "date_numerical", "date_unit"]
+
+
+def coerce_item(item):
+    """Return a copy of a raw forecast with known near-misses fixed, and whether anything changed.
+
+    Only values the model gave are fixed; missing or null fields are left
+    to fail validation, so they are sent to the repair prompt.
+    """
+    fixed = dict(item)
+    for field in ENUM_FIELDS:
+        value = fixed.get(field)
+        if value is None:
+            continue
+        if isinstance(value, (int, float)) and field == "date_numerical":
+            value = str(int(value))
+        if not isinstance(value, str):
+            continue
+        value = value.strip()
+        if value.lower() == "none":
+            value = "none"
+        fixed[field] = NEAR_MISSES.get(field, {}).get(value.lower(), value)
+    category = fixed.get("economic_category")
+    if isinstance(category, str) and category.upper() in (
+        "CPI", "MS", "W", "E", "IO", "PPI", "RS", "EURPLN", "UR", "PMI", "IR"
+    ):
+        fixed["economic_category"] = category.upper()
+    for field in ("value_numerical_from", "value_numerical_to"):
+        value = fixed.get(field)
+        # The field descriptions ask for "none" when there is no value, which is stored as 0
+        if isinstance(value, str) and value.strip().lower() == "none":
+            fixed[field] = 0.0
+        # The schema asks for absolute values
+        elif isinstance(value, (int, float)) and not isinstance(value, bool) and value < 0:
+            fixed[field] = -value
+    return fixed, fixed != item
+
+
+def item_schema(schema):
+    """The model of a single forecast of a `Forecasts`-like schema."""
+    return schema.__fields__["forecast"].type_
+
+
+def tool_call_items(raw):
+    """Raw forecast dicts from the first tool call of a model message, or None without a tool call."""
+    tool_calls = getattr(raw, "tool_calls", None)
+    if not tool_calls:
+        return None
+    items = tool_calls[0]["args"].get("forecast")
+    return [item for item in items if isinstance(item, dict)] if isinstance(items, list) else None
+
+
+class SalvageStats:
+    """Counts of forecasts salvaged from invalid responses, with failures per field."""
+
+    def __init__(self):
+        self.field_failures = Counter()
+        self.salvaged_responses = 0
+        self.coerced = 0
+        self.repaired = 0
+        self.dropped = 0
+
+    def summary(self):
+        fields = ", ".join(f"{field}: {count}" for field, count in self.field_failures.most_common()) or "none"
+        return (
+            f"Salvage: {self.salvaged_responses} invalid response(s), {self.coerced} forecast(s) coerced, "
+            f"{self.repaired} repaired, {self.dropped} dropped. Validation failures by field: {fields}."
+        )
+
+
+def validate_items(items, model, stats):
+    """Validate raw forecasts one by one; return the valid models and the failed (item, errors) pairs."""
+    valid = []
+    failed = []
+    for item in items:
+        fixed, changed = coerce_item(item)
+        try:
+            valid.append(model.parse_obj(fixed))
+        except ValidationError as e:
+            errors = e.errors()
+            stats.field_failures.update(str(error["loc"][0]) for error in errors)
+            failed.append((fixed, [f"{error['loc'][0]}: {error['msg']}" for error in errors]))
+            continue
+        stats.coerced += changed
+    return valid, failed
+
+
+def salvage(result, schema, stats):
+    """Response and failed items of a chain built with `with_structured_output(..., include_raw=True)`.
+
+    A valid response is returned as is. Otherwise the forecasts of the raw
+    tool call are validated one by one and the valid ones are kept. Without
+    a tool call the parsing error is raised.
+    """
+    if result["parsing_error"] is None and result["parsed"] is not None:
+        return result["parsed"], []
+    items = tool_call_items(result["raw"])
+    if items is None:
+        raise result["parsing_error"] or OutputParserException("No tool call in the model response.")
+    stats.salvaged_responses += 1
+    valid, failed = validate_items(items, item_schema(schema), stats)
+    return schema.construct(forecast=valid), failed
+
+
+def repair_inputs(failed):
+    return {"items": "\n".join(json.dumps({"forecast": item, "errors": errors}, ensure_ascii=False) for item, errors in failed)}
+
+
+def repaired_items(result, schema, failed, stats):
+    """Valid forecasts of a repair response; forecasts that are still invalid are dropped."""
+    if result["parsing_error"] is None and result["parsed"] is not None:
+        items = [item.dict() for item in result["parsed"].forecast]
+    else:
+        items = tool_call_items(result["raw"]) or []
+    # The repair prompt asks for the same forecasts; anything beyond them is ignored
+    valid, _ = validate_items(items[:len(failed)], item_schema(schema), SalvageStats())
+    stats.repaired += len(valid)
+    stats.dropped += len(failed) - len(valid)
+    return valid
@@ -0,0 +1,178 @@
+from typing import List
+
+from langchain_core.pydantic_v1 import BaseModel, Field, validator
+
+
+# Define the output structure
+class Classification(BaseModel):
+    forecast: str = Field(
+        ...,
+        description="""
+        Forecast content.
+        """,
+    )
+    economic_category: str = Field(
+        ...,
+        description="""
+        Specifies the economic category of the forecast.        
+        Returns one of the economic categories below:
+        - PPI: when the forecast is for the annual (%y/y) or monthly (%m/m) dynamics of producer price inflation (PPI), also referred to as producer price inflation, in Poland, or when no country is indicated
+        - CPI: annual (%y/y)or monthly (%m/m) consumer price inflation (CPI) dynamics in Poland or when no country is indicated. 
+        - IO: when the forecast is for annual (%y/y) or monthly (%m/m) industrial production dynamics in Poland or when no other country is indicated. 
+        - RS: when the forecast is for annual (%y/y) or monthly (%m/m) retail sales growth in Poland in nominal terms, or no country is indicated
+        - MS: when the forecast is for annual (%y/y) or monthly (%m/m) money supply in Poland, or no country is indicated.
+        - W: when the forecast is for annual (%y/y) or monthly (%m/m) nominal wage growth in Poland, or no country is indicated.
+        - E: when the forecast is for annual (%y/y) or monthly (%m/m) employment growth in Poland or no country is indicated. 
+        - EURPLN: when the forecast is for the PLN/Euro exchange rate.
+        - UR: when the forecast is for the registered unemployment rate in Poland or no country is indicated.
+        - PMI: when the forecast is for the PMI index for Poland.
+        - IR: when the forecast is for the National Bank of Poland (NBP) base interest rate as determined by the MPC. When the forecast includes “Fed” or “Federal Reserve” or “ECB” then do not classify it as “IR”, but “none”. 
+        - none: when the forecast does not apply to any of the above categories or applies to the relationship of an economic indicator to another indicator. 
+
+        """,
+        enum=['CPI', 'MS', 'W', 'E', 'IO', 'PPI','RS','EURPLN', 'UR', 'PMI','IR', 'none'],
+    )
+    direction: str = Field(
+        ...,
+        description="""
+        Specifies the direction or sign of the forecast.
+
+        For CPI, MS, W, E, IO, PPI, RS categories, returns the sign of the forecast as one of the values below:   
+        - positive: when the forecast of the annual change (%y/y) or monthly change (%m/m) is positive, when both are given returns the sign for %y/y
+        - negative: when the forecast of annual change (%y/y) or monthly change (%m/m) is negative, when both changes are given returns the sign for %y/y
+        - zero: when the forecast indicates zero annual or monthly growth, when both changes are given returns the sign for %y/y
+        - none: when it is not possible to specify the sign of the forecast
+        
+        Note the difference: the text “a 2%y/y decrease in inflation” implies a “negative” sign, while the text “a 2%y/y decrease in inflation” implies a “positive” sign.
+        Note that, for example, the text “inflation fell to 1.5%y/y” implies a “positive” sign, similarly, the text “output fell to 0.5%y/y” implies a “positive” sign.
+
+        For the categories EURPLN, UR, PMI, IR returns the direction of the forecast as one of the values below:
+        - increase: when the forecast is for an increase in a given economic category
+        - decrease: when the forecast is for a decrease in a given economic category
+        - no change: when the forecast indicates no change
+        - none: when the forecast does not indicate any of the above directions, or it is not possible to determine the direction of the forecast.
+        """,  
+        enum=["positive", "negative", "zero", "increase", "decrease", "no change", "none"],
+    )
+    value_numerical_from: float = Field(
+        ...,
+        description="""
+
+        For the categories CPI, MS, W, E, IO, PPI, RS, UR, PMI, IR, it returns the numerical value of the forecast as a number greater than or equal to 0. For range forecasts, it returns the lower value of the range. When the forecast is negative, it returns the absolute value.
+
+        For the EURPLN category, it returns the euro exchange rate expressed in PLN as a number greater than or equal to in the range from 3 to 5 with 2 decimal places. When the value is different it returns “none”.
+        
+        If the text describing the forecast for the IR specifies the number of interest rate cuts or increases, (n.p. two cuts) and not the size of the change, it returns “none”.
+        """,
+    )
+    value_numerical_to: float = Field(
+        ...,
+        description="""
+        For the categories CPI, MS, W, E, IO, PPI, RS, UR, PMI, IR, it returns the numerical value of the forecast as a number greater than or equal to 0. For range forecasts, it returns the lower value of the range. When the forecast is negative, it returns the absolute value.
+
+        For the EURPLN category, it returns the euro exchange rate expressed in zlotys as a float number, only in the range from 3.0 to 5.0 with 2 decimal places. When the value is different it returns “none”.
+        
+        If the text describing the forecast for the IR specifies the number of interest rate cuts or increases (e.g., two cuts), rather than the size of the change, it returns “none.”
+        """,
+    )
+    value_unit: str = Field(
+        ...,
+        description="""
+        Returns the unit of measure of the forecast value. 
+        For the CPI, MS, W, E, IO, PPI, RS categories, only “%y/y” (meaning year-to-year percentage) and “%m/m” (meaning month-to-month percentage) are allowed. If the forecast does not indicate the unit of measurement or is for a period other than month, quarter or year, it returns “none.” 
+
+        For the IR category, it returns: '%' (indicating the value in percent), 'pp' (indicating the change in IR in percentage points) or 'pb' (indicating the change in IR in basis points).
+        
+        For the PMI category, it returns: “pt” (signifying the value in points)
+
+        For the UR category, returns: “%” (meaning the value in percent)
+        
+        For the EURPLN category, it returns “none”.
+        """,
+        enum=["%y/y", "%m/m", "pt", "pp", "pb", "other", "none"]
+    )
+    date_numerical: str = Field(
+        ...,
+        description="""
+        Returns the numerical value of the forecast period. 
+        For the categories CPI, MS, W, E, IO, PPI, RS, UR, PMI, IR, it returns a numerical representation of the month, e.g. “1” for January, “12” for December, etc.
+        If the forecast refers to a previous period, it returns “none”
+        If a time period other than a month is indicated in the forecast, it returns “other”.
+        If no period is indicated in the forecast, it returns “none”.
+
+        For the EURPLN category, returns “today” if the forecast refers to today or other or none in other cases.
+        """,
+        enum=["1","2","3","4","5","6","7","8","9","10","11","12", "today", "other", "none"]
+    )
+    date_unit: str = Field(
+        ...,
+        description="""
+        Returns the unit of measure of the forecast period. 
+        For the CPI, MS, W, E, IO, PPI, RS, UR, PMI, IR categories, returns “month” when the forecast is for a specific month, “other” when it is for another period, or “none” when the period in question is not mentioned in the forecast.
+        For the EURPLN category, it returns “day” if the forecast is for today, or other or none in other cases.
+        """,
+        enum=["month", "day", "other", "none"]
+    )
+    
+    @validator('economic_category', allow_reuse=True)
+    def check_values_economic_category(cls, value):
+        if value not in ['CPI', 'MS', 'W', 'E', 'IO', 'PPI','RS', 'UR', 'PMI', 'IR', 'EURPLN','none']:
+            raise ValueError('Value must be one of the following: CPI, MS, W, E, IO, PPI, RS, UR, PMI, IR, EURPLN, none')
+        return value
+    
+    @validator('direction', allow_reuse=True)
+    def check_values_direction(cls, value):
+        if value not in ["increase", "decrease", "positive", "negative", "zero", "no change", "none"]:
+            raise ValueError('Value must be one of the following: "increase", "decrease", "positive", "negative", "zero", "no change", "none"')
+        return value
+
+    @validator('value_unit', allow_reuse=True)
+    def check_values_value_unit(cls, value):
+        if value not in ["%y/y", "%m/m", "pt", "pb", "pp", "none"]:
+            raise ValueError('Value must be one of the following: ""%y/y", "%m/m", "pt", "pb", "pp", "none"')
+        return value
+    
+    @validator('date_unit', allow_reuse=True)
+    def check_values_date_unit(cls, value):
+        if value not in ["month", "day", "other", "none"]:
+            raise ValueError('Value must be one of the following: "month", "day", "other", "none"')
+        return value
+
+
+    @validator('date_numerical', allow_reuse=True)
+    def check_values_date_numerical(cls, value):
+        if value not in ["1","2","3","4","5","6","7","8","9","10","11","12", "today", "other", "none"]:
+            raise ValueError('Value must be one of the following: "1","2","3","4","5","6","7","8","9","10","11","12", "today", "other", "none"')
+        return value
+
+    @validator('value_numerical_to', allow_reuse=True)
+    def check_positive_value_numerical_to(cls, value):
+        if value < 0:
+            raise ValueError('Value must be positive')
+        return value
+    
+    @validator('value_numerical_from', allow_reuse=True)
+    def check_positive_value_numerical_from(cls, value):
+        if value < 0:
+            raise ValueError('Value must be positive')
+        return value
+
+class Forecasts(BaseModel):
+    """Extracted forecasts from comment."""
+    forecast: List[Classification]
+
+
+class PackedClassification(Classification):
+    id: str = Field(
+        ...,
+        description="""
+        The id of the comment the forecast was extracted from.
+        """,
+    )
+
+
+class PackedForecasts(BaseModel):
+    """Extracted forecasts from several comments."""
+    forecast: List[PackedClassification]
+
+
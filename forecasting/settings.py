@@ -0,0 +1,87 @@
+# Settings of a run. Edit them here, override them on the command line (see
+# `python main.py --help`), or assign them before the first call into the
+# pipeline, e.g. `forecasting.settings.async_mode = True`. The model, chains,
+# examples, cache and prefilter are built on first use from the values set then.
+
+model_name = "gpt-4o"
+temperature = 0
+# "openai" or "fake": a local stand-in model replaying the forecasts in fake_responses_path.
+# The MODEL_BACKEND environment variable (or .env entry) takes precedence on the command line.
+model_backend = "openai"
+
+filename = 'data/reports.csv'
+output_filename = 'data/forecasts.csv'
+examples_filename = 'data/examples.csv'
+
+# Concurrent execution: set async_mode = True (or pass --async) to process reports with chain.ainvoke.
+# Adjust the limits below to the rate limits of your OpenAI account.
+async_mode = False
+max_concurrency = 8
+requests_per_minute = 500
+tokens_per_minute = 800000
+completion_tokens_estimate = 1000
+request_timeout = 120
+max_backoff_retries = 6
+
+# Response cache: validated responses are reused as long as the prompt, examples,
+# model settings and report text are unchanged. Set cache_read_only = True to use
+# an existing cache without adding to it.
+use_cache = True
+cache_path = "data/cache.sqlite"
+cache_read_only = False
+cache_max_age_days = 90
+cache_max_size_mb = 500
+
+# Few-shot examples: by default the whole examples list is sent with every report,
+# as in the paper. With examples_top_k (e.g. 30), only the examples_top_k examples most
+# similar to the report (and at least one per category) are put into the prompt.
+examples_top_k = None
+example_index_path = "data/examples_index.npz"
+
+# Prefilter: only sentences that look like forecasts (with neighbouring sentences as
+# context) are sent to the model, split at sentence boundaries into parts of at most max_part_chars characters.
+# Reports without any candidate sentences are not sent at all. Off by default, so whole
+# reports are sent as in the paper.
+use_prefilter = False
+prefilter_min_score = 4
+prefilter_context_sentences = 1
+max_part_chars = 12000
+
+# Packing: set use_packing = True to send several short reports, each tagged with its id,
+# in one request of at most pack_max_tokens report tokens. If a packed response is
+# invalid, its reports are sent one at a time.
+use_packing = False
+pack_max_tokens = 4000
+pack_max_reports = 8
+
+# Lenient validation: when some forecasts of a response are invalid, the valid ones are
+# kept, known near-misses (e.g. "no_change") are coerced and only the invalid forecasts
+# are sent back to the model for repair. Set lenient_validation = False to retry the
+# whole report instead.
+lenient_validation = True
+
+# Telemetry: per-document timings, token usage and outcomes are written to metrics_path,
+# and a summary is printed at the end of a run. Prices (USD per million tokens) are
+# used for the cost estimate. Set prometheus_path to also export the run totals in the
+# Prometheus text format.
+metrics_path = "data/metrics.jsonl"
+prometheus_path = None
+input_price_per_million = 2.50
+output_price_per_million = 10.00
+
+# Forecast store: set store_path (or pass --store) to also write the reports and their
+# forecasts to an SQLite database indexed on category, target date and report id.
+# Re-processed reports replace their previous forecasts.
+store_path = None
+
+# Fake model (model_backend = "fake"): median latency in seconds and its lognormal
+# sigma, and the shares of requests failing with a 429 error or a timeout, or
+# answered with an invalid forecast. Its responses are replayed from fake_responses_path,
+# which must not be the output of the run.
+fake_responses_path = "data/forecasts.csv"
+fake_latency = 0.0
+fake_latency_sigma = 0.5
+fake_error_rate = 0.0
+fake_timeout_rate = 0.0
+fake_invalid_rate = 0.0
+fake_seed = 0
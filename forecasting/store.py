@@ -0,0 +1,200 @@
+import hashlib
+import sqlite3
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+
+
+FORECAST_FIELDS = [
+    "forecast", "economic_category", "direction", "value_numerical_from",
+    "value_numerical_to", "value_unit", "date_numerical", "date_unit"
+]
+
+# SQLite allows at most 999 variables per statement in older versions
+MAX_VARIABLES = 500
+
+
+def text_hash(text):
+    return hashlib.sha256(str(text).encode("utf-8")).hexdigest()
+
+
+def plain(value):
+    """Convert NumPy scalars (e.g. ids read with pandas) to Python values for sqlite3."""
+    return value.item() if hasattr(value, "item") else value
+
+
+def report_key(doc_id):
+    """Report ids are stored as text, so `1` and `"1"` are the same report."""
+    return str(plain(doc_id))
+
+
+def iso_date(value):
+    """`2.01.2004` -> `2004-01-02`, so report dates compare and sort as text; other values are kept."""
+    try:
+        return datetime.strptime(str(value), "%d.%m.%Y").date().isoformat()
+    except ValueError:
+        return value
+
+
+def where_clause(conditions):
+    """SQL WHERE clause and parameters for (column, operator, value) conditions.
+
+    Conditions with a None value are left out; with a list value, `=` matches
+    any of its items.
+    """
+    clauses = []
+    params = []
+    for column, operator, value in conditions:
+        if value is None:
+            continue
+        if operator == "=" and isinstance(value, (list, tuple, set, np.ndarray, pd.Series)):
+            values = [plain(item) for item in value]
+            clauses.append(f"{column} IN ({', '.join('?' * len(values))})")
+            params.extend(values)
+        else:
+            clauses.append(f"{column} {operator} ?")
+            params.append(plain(value))
+    return (" WHERE " + " AND ".join(clauses) if clauses else ""), params
+
+
+class ForecastStore:
+    """SQLite database of reports and their forecasts.
+
+    The reports table holds the id, date (ISO format when it can be parsed)
+    and a hash of the text of every processed report; the forecasts table is
+    indexed on economic category, target date (date_numerical) and report id.
+    Reports are buffered and written `batch_size` at a time in one
+    transaction. Writing a report replaces its previous forecasts, so
+    re-processing a report never duplicates them.
+    """
+
+    def __init__(self, path, batch_size=50):
+        self.path = path
+        self.batch_size = batch_size
+        self.pending = []
+        # The timeout lets several processes (e.g. shards of a run) write to the same store
+        self.conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS reports (
+                id TEXT PRIMARY KEY,
+                date TEXT,
+                text_hash TEXT NOT NULL,
+                updated_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS forecasts (
+                report_id TEXT NOT NULL REFERENCES reports (id),
+                position INTEGER NOT NULL,
+                forecast TEXT,
+                economic_category TEXT,
+                direction TEXT,
+                value_numerical_from REAL,
+                value_numerical_to REAL,
+                value_unit TEXT,
+                date_numerical TEXT,
+                date_unit TEXT,
+                PRIMARY KEY (report_id, position)
+            );
+            CREATE INDEX IF NOT EXISTS idx_reports_date ON reports (date);
+            CREATE INDEX IF NOT EXISTS idx_forecasts_category ON forecasts (economic_category, date_numerical);
+            CREATE INDEX IF NOT EXISTS idx_forecasts_date ON forecasts (date_numerical);
+            """
+        )
+        self.conn.commit()
+
+    def add(self, doc_id, date, text, records):
+        """Buffer a report and its forecast records (dicts with the forecast fields)."""
+        self.pending.append((report_key(doc_id), iso_date(date), text_hash(text), records))
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        if not self.pending:
+            return
+        # A report added twice since the last flush keeps its last forecasts
+        self.pending = list({doc_id: (doc_id, *rest) for doc_id, *rest in self.pending}.values())
+        now = time.time()
+        with self.conn:
+            self.conn.executemany(
+                "INSERT INTO reports (id, date, text_hash, updated_at) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (id) DO UPDATE SET date = excluded.date, text_hash = excluded.text_hash, "
+                "updated_at = excluded.updated_at",
+                [(doc_id, date, digest, now) for doc_id, date, digest, records in self.pending],
+            )
+            self.conn.executemany(
+                "DELETE FROM forecasts WHERE report_id = ?",
+                [(doc_id,) for doc_id, date, digest, records in self.pending],
+            )
+            self.conn.executemany(
+                f"INSERT INTO forecasts (report_id, position, {', '.join(FORECAST_FIELDS)}) "
+                f"VALUES ({', '.join('?' * (len(FORECAST_FIELDS) + 2))})",
+                [
+                    (doc_id, position, *(plain(record[field]) for field in FORECAST_FIELDS))
+                    for doc_id, date, digest, records in self.pending
+                    for position, record in enumerate(records)
+                ],
+            )
+        self.pending = []
+
+    def unchanged(self, ids, texts):
+        """Mask of the reports already stored with the same text."""
+        ids = [report_key(doc_id) for doc_id in ids]
+        stored = {}
+        for start in range(0, len(ids), MAX_VARIABLES):
+            batch = ids[start:start + MAX_VARIABLES]
+            stored.update(self.conn.execute(
+                f"SELECT id, text_hash FROM reports WHERE id IN ({', '.join('?' * len(batch))})", batch
+            ).fetchall())
+        return np.array([stored.get(doc_id) == text_hash(text) for doc_id, text in zip(ids, texts)], dtype=bool)
+
+    def _select(self, economic_category, date_numerical, report_id, date_from, date_to):
+        if report_id is not None:
+            if isinstance(report_id, (list, tuple, set, np.ndarray, pd.Series)):
+                report_id = [report_key(doc_id) for doc_id in report_id]
+            else:
+                report_id = report_key(report_id)
+        where, params = where_clause([
+            ("f.economic_category", "=", economic_category),
+            ("f.date_numerical", "=", date_numerical),
+            ("f.report_id", "=", report_id),
+            ("r.date", ">=", iso_date(date_from) if date_from is not None else None),
+            ("r.date", "<=", iso_date(date_to) if date_to is not None else None),
+        ])
+        sql = (
+            f"SELECT f.report_id AS id, r.date AS report_date, {', '.join('f.' + field for field in FORECAST_FIELDS)} "
+            f"FROM forecasts f JOIN reports r ON r.id = f.report_id{where} ORDER BY r.rowid, f.position"
+        )
+        return sql, params
+
+    def query(self, economic_category=None, date_numerical=None, report_id=None, date_from=None, date_to=None):
+        """DataFrame of the forecasts matching all given filters, with the date of their report.
+
+        `economic_category`, `date_numerical` and `report_id` take a value or a
+        list of values (report ids are compared as text, and returned as text); `date_from` and `date_to` bound the report date
+        (inclusive, ISO or `d.m.Y` format).
+        """
+        sql, params = self._select(economic_category, date_numerical, report_id, date_from, date_to)
+        return pd.read_sql_query(sql, self.conn, params=params, dtype={"date_numerical": str})
+
+    def export_csv(self, path, economic_category=None, date_numerical=None, report_id=None, date_from=None,
+                   date_to=None, chunksize=100000):
+        """Write the forecasts matching the filters (see `query`) to a CSV file like forecasts.csv."""
+        sql, params = self._select(economic_category, date_numerical, report_id, date_from, date_to)
+        rows = 0
+        header = True
+        for chunk in pd.read_sql_query(sql, self.conn, params=params, chunksize=chunksize):
+            chunk.drop(columns="report_date").to_csv(path, mode="w" if header else "a", header=header, index=False)
+            header = False
+            rows += len(chunk)
+        if header:
+            pd.DataFrame(columns=["id"] + FORECAST_FIELDS).to_csv(path, index=False)
+        return rows
+
+    def close(self):
+        if self.conn is not None:
+            self.flush()
+            self.conn.close()
+            self.conn = None
@@ -0,0 +1,134 @@
+import csv
+import os
+import zlib
+
+import numpy as np
+import pandas as pd
+
+
+def read_checkpoint(checkpoint_path):
+    """Return the set of document ids (as strings) recorded as completed."""
+    if not os.path.exists(checkpoint_path):
+        return set()
+    with open(checkpoint_path, encoding="utf-8") as f:
+        return {line.strip() for line in f if line.strip()}
+
+
+def in_shard(ids, index, count):
+    """Mask of the ids belonging to shard `index` of `count`, by a stable hash of the id.
+
+    The assignment does not depend on the order of the reports or on the
+    chunk size, so every process running a shard gets the same slice.
+    """
+    hashes = np.fromiter((zlib.crc32(str(doc_id).encode("utf-8")) for doc_id in ids), dtype=np.int64, count=len(ids))
+    return hashes % count == index
+
+
+def read_reports(filename, chunksize, skip_ids=(), shard=None):
+    """Yield chunks of reports, leaving out documents whose id is in `skip_ids`.
+
+    With `shard=(index, count)` only the reports of that shard are read.
+    """
+    for chunk in pd.read_csv(filename, sep=';', chunksize=chunksize):
+        if shard is not None:
+            chunk = chunk[in_shard(chunk['id'], *shard)]
+        if skip_ids:
+            chunk = chunk[~chunk['id'].astype(str).isin(skip_ids)]
+        if len(chunk):
+            yield chunk
+
+
+def shard_path(path, index, count):
+    """`data/forecasts.csv` -> `data/forecasts-shard0of4.csv`"""
+    stem, ext = os.path.splitext(path)
+    return f"{stem}-shard{index}of{count}{ext}"
+
+
+def merge_shards(paths, reports_filename, output_path):
+    """Concatenate the forecasts CSV files of shards into `output_path`, in the order of the reports."""
+    merged = pd.concat(
+        [pd.read_csv(path, dtype=str, keep_default_na=False) for path in paths], ignore_index=True
+    )
+    ids = pd.read_csv(reports_filename, sep=';', usecols=['id'], dtype=str)['id'].drop_duplicates()
+    position = pd.Series(np.arange(len(ids)), index=ids.to_numpy())
+    # Forecasts of ids missing from the reports go last; the order within a report is kept
+    order = position.reindex(merged['id']).fillna(len(ids)).to_numpy()
+    merged.iloc[np.argsort(order, kind="stable")].to_csv(output_path, index=False)
+    return len(merged)
+
+
+class CheckpointedWriter:
+    """Appends forecasts to a CSV file and records completed document ids.
+
+    Forecasts are flushed to disk before the ids of their documents are added
+    to the checkpoint, so every id in the checkpoint has all its forecasts in
+    the output. When resuming, rows of documents missing from the checkpoint
+    (written just before an interruption) are dropped, so they are not
+    duplicated when these documents are processed again. With a `store`
+    (a `ForecastStore`), documents are also written to it, and committed to
+    it before they are added to the checkpoint. Documents that failed are
+    only counted in `failed`: they are left out of the output, the store
+    and the checkpoint, so a resumed run processes them again.
+    """
+
+    def __init__(self, output_path, checkpoint_path, columns, resume=False, flush_every=50, store=None):
+        self.output_path = output_path
+        self.store = store
+        self.checkpoint_path = checkpoint_path
+        self.columns = columns
+        self.flush_every = flush_every
+        self.done = read_checkpoint(checkpoint_path) if resume else set()
+        self.pending = []
+        self.failed = []
+
+        # An empty output (killed before its header was written) has no rows to keep
+        if resume and os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            self._drop_unfinished()
+            self.output = open(output_path, "a", newline="", encoding="utf-8")
+            self.writer = csv.DictWriter(self.output, fieldnames=columns, lineterminator="\n")
+        else:
+            self.output = open(output_path, "w", newline="", encoding="utf-8")
+            self.writer = csv.DictWriter(self.output, fieldnames=columns, lineterminator="\n")
+            self.writer.writeheader()
+            self.output.flush()
+            os.fsync(self.output.fileno())
+            open(checkpoint_path, "w").close()
+            self.done = set()
+        self.checkpoint = open(checkpoint_path, "a", encoding="utf-8")
+
+    def _drop_unfinished(self):
+        tmp_path = self.output_path + ".tmp"
+        header = True
+        for chunk in pd.read_csv(self.output_path, chunksize=100000, dtype=str, keep_default_na=False):
+            chunk[chunk['id'].isin(self.done)].to_csv(tmp_path, mode="w" if header else "a", header=header, index=False)
+            header = False
+        if header:
+            pd.DataFrame(columns=self.columns).to_csv(tmp_path, index=False)
+        os.replace(tmp_path, self.output_path)
+
+    def write(self, doc_id, records, date=None, text=None):
+        self.writer.writerows(records)
+        if self.store is not None:
+            self.store.add(doc_id, date, text, records)
+        self.pending.append(str(doc_id))
+        if len(self.pending) >= self.flush_every:
+            self.flush()
+
+    def fail(self, doc_id):
+        self.failed.append(str(doc_id))
+
+    def flush(self):
+        self.output.flush()
+        os.fsync(self.output.fileno())
+        if self.store is not None:
+            self.store.flush()
+        self.checkpoint.writelines(f"{doc_id}\n" for doc_id in self.pending)
+        self.checkpoint.flush()
+        os.fsync(self.checkpoint.fileno())
+        self.done.update(self.pending)
+        self.pending = []
+
+    def close(self):
+        self.flush()
+        self.output.close()
+        self.checkpoint.close()
@@ -0,0 +1,137 @@
+import json
+import time
+from array import array
+from collections import Counter
+
+import numpy as np
+
+
+PHASES = ("render", "network", "validation")
+COUNTERS = ("requests", "retries", "cache_hits", "prompt_tokens", "completion_tokens")
+
+
+def plain(value):
+    """Convert NumPy scalars (e.g. ids read with pandas) to Python values for JSON."""
+    return value.item() if hasattr(value, "item") else value
+
+
+class Telemetry:
+    """Per-document timings, token usage and outcomes of a run.
+
+    Measurements of a request are split evenly between the documents it
+    covers, so a packed request is shared by all its reports. Each finished
+    document is written as one JSON line to `path`; only run totals and the
+    per-document wall and network times are kept in memory. With `append`,
+    lines are added to an existing file, e.g. when resuming a run. A disabled
+    (or closed) instance records nothing, so documents that are never
+    finished, e.g. of `extract` called outside a run, are not kept.
+    """
+
+    def __init__(self, path=None, input_price_per_million=0.0, output_price_per_million=0.0, append=False,
+                 enabled=True):
+        self.path = path
+        self.enabled = enabled
+        self.mode = "a" if append else "w"
+        self.file = None
+        self.input_price = input_price_per_million / 1e6
+        self.output_price = output_price_per_million / 1e6
+        self.open = {}
+        self.wall_times = array("d")
+        self.network_times = array("d")
+        self.totals = Counter()
+        self.categories = Counter()
+        self.documents = 0
+        self.started = time.perf_counter()
+
+    def add(self, doc_ids, started=None, **values):
+        """Add phase durations (seconds) and counters to the documents in `doc_ids`."""
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        share = 1 / len(doc_ids)
+        for doc_id in doc_ids:
+            metrics = self.open.get(doc_id)
+            if metrics is None:
+                metrics = self.open[doc_id] = Counter(started=started or now)
+            metrics["started"] = min(metrics["started"], started or now)
+            metrics["finished"] = now
+            for key, value in values.items():
+                metrics[key] += value * share
+
+    def finish(self, doc_id, records):
+        """Record the outcome of a document and write its metrics line."""
+        if not self.enabled:
+            return
+        metrics = self.open.pop(doc_id, Counter())
+        categories = Counter(record["economic_category"] for record in records)
+        wall = metrics["finished"] - metrics["started"]
+        self.documents += 1
+        self.wall_times.append(wall)
+        self.network_times.append(metrics["network"])
+        self.categories.update(categories)
+        self.totals.update({key: metrics[key] for key in PHASES + COUNTERS})
+        self.totals["forecasts"] += len(records)
+        if self.path:
+            if self.file is None:
+                self.file = open(self.path, self.mode, encoding="utf-8")
+            line = {"id": plain(doc_id), "wall_ms": round(wall * 1000, 3)}
+            line.update({f"{phase}_ms": round(metrics[phase] * 1000, 3) for phase in PHASES})
+            line.update({key: round(metrics[key], 2) for key in COUNTERS})
+            line["forecasts"] = len(records)
+            line["categories"] = dict(categories)
+            self.file.write(json.dumps(line) + "\n")
+
+    def cost(self):
+        return self.totals["prompt_tokens"] * self.input_price + self.totals["completion_tokens"] * self.output_price
+
+    def percentiles(self, values, quantiles=(50, 95, 99)):
+        if not len(values):
+            return [0.0] * len(quantiles)
+        return np.percentile(np.frombuffer(values, dtype=np.float64), quantiles).tolist()
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        wall = ", ".join(f"{value * 1000:.0f}" for value in self.percentiles(self.wall_times))
+        network = ", ".join(f"{value * 1000:.0f}" for value in self.percentiles(self.network_times))
+        phases = ", ".join(f"{phase} {self.totals[phase]:.1f}s" for phase in PHASES)
+        categories = ", ".join(f"{category}: {count}" for category, count in sorted(self.categories.items())) or "none"
+        return (
+            f"Telemetry: {self.documents} document(s) in {elapsed:.1f}s, {self.totals['requests']:.0f} request(s), "
+            f"{self.totals['retries']:.0f} retries, {self.totals['cache_hits']:.0f} cache hit(s).\n"
+            f"  Document time p50/p95/p99: {wall} ms; network time p50/p95/p99: {network} ms; {phases}.\n"
+            f"  Tokens: {self.totals['prompt_tokens']:.0f} prompt, {self.totals['completion_tokens']:.0f} completion, "
+            f"estimated cost ${self.cost():.2f}.\n"
+            f"  Forecasts by economic_category: {categories}."
+        )
+
+    def write_prometheus(self, path):
+        """Write the run totals in the Prometheus text exposition format."""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            lines.extend(f"{name}{labels} {value}" for labels, value in samples)
+
+        metric("forecast_documents_total", "counter", "Documents processed.", [("", self.documents)])
+        for key in COUNTERS + ("forecasts",):
+            metric(f"forecast_{key}_total", "counter", f"Total {key.replace('_', ' ')}.", [("", round(self.totals[key], 2))])
+        metric("forecast_phase_seconds_total", "counter", "Time spent per phase.",
+               [(f'{{phase="{phase}"}}', round(self.totals[phase], 6)) for phase in PHASES])
+        quantiles = (0.5, 0.95, 0.99)
+        values = self.percentiles(self.wall_times, [q * 100 for q in quantiles])
+        metric("forecast_document_seconds", "summary", "Wall time per document.",
+               [(f'{{quantile="{q}"}}', round(v, 6)) for q, v in zip(quantiles, values)]
+               + [("_sum", round(sum(self.wall_times), 6)), ("_count", self.documents)])
+        metric("forecast_cost_dollars_total", "counter", "Estimated cost of the requests.", [("", round(self.cost(), 6))])
+        metric("forecast_category_forecasts_total", "counter", "Forecasts per economic category.",
+               [(f'{{economic_category="{category}"}}', count) for category, count in sorted(self.categories.items())])
+        with open(path, "w", encoding="utf-8") as f:
+            f.write("\n".join(lines) + "\n")
+
+    def close(self):
+        self.enabled = False
+        self.open.clear()
+        if self.file is not None:
+            self.file.close()
+            self.file = None
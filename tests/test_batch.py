@@ -0,0 +1,90 @@
+import csv
+import json
+import os
+import shutil
+
+import pytest
+
+from forecasting import batch, pipeline
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES = os.path.join(ROOT, "tests", "fixtures", "batch")
+
+
+@pytest.fixture
+def batch_dir(tmp_path, monkeypatch):
+    # The prompt is built from data/examples.csv
+    monkeypatch.chdir(ROOT)
+    return str(tmp_path / "batch")
+
+
+def copy_fixtures(batch_dir, *names):
+    os.makedirs(batch_dir, exist_ok=True)
+    for name in names:
+        shutil.copy(os.path.join(FIXTURES, name), batch_dir)
+
+
+def read_lines(path):
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip()]
+
+
+def read_output(path):
+    with open(path, newline="", encoding="utf-8") as f:
+        return list(csv.DictReader(f))
+
+
+def test_split_custom_id():
+    assert batch.split_custom_id(batch.make_custom_id("a-b", 3)) == ("a-b", 3)
+
+
+def test_build_batch(batch_dir):
+    pipeline.build_batch(os.path.join(FIXTURES, "reports.csv"), batch_dir)
+    requests = list(batch.read_jsonl([os.path.join(batch_dir, "requests-0000.jsonl")]))
+    assert [request["custom_id"] for request in requests] == ["1-0", "2-0", "3-0"]
+    body = requests[0]["body"]
+    assert body["tool_choice"]["function"]["name"] == "Forecasts"
+    assert "CPI inflation to rise to 1.9% y/y" in body["messages"][-1]["content"]
+
+
+def test_build_batch_splits_request_files(batch_dir):
+    pipeline.build_batch(os.path.join(FIXTURES, "reports.csv"), batch_dir, max_requests_per_file=2)
+    assert sorted(os.listdir(batch_dir)) == ["requests-0000.jsonl", "requests-0001.jsonl"]
+
+
+def test_ingest_batch(batch_dir):
+    copy_fixtures(batch_dir, "requests-0000.jsonl", "results-0000.jsonl")
+    output_path = os.path.join(batch_dir, "forecasts.csv")
+    pipeline.ingest_batch(output_path, batch_dir)
+
+    rows = read_output(output_path)
+    assert [(row["id"], row["economic_category"]) for row in rows] == [("1", "CPI")]
+    with open(output_path, "rb") as f:
+        assert b"\r\n" not in f.read()
+    # 2-0 failed, 3-0 has an invalid category and 4-0 has no result
+    assert read_lines(os.path.join(batch_dir, "failed.txt")) == ["2-0", "3-0", "4-0"]
+
+
+def test_build_batch_only_failed(batch_dir):
+    os.makedirs(batch_dir)
+    with open(os.path.join(batch_dir, "failed.txt"), "w", encoding="utf-8") as f:
+        f.write("2-0\n")
+    pipeline.build_batch(os.path.join(FIXTURES, "reports.csv"), batch_dir, only_failed=True)
+    assert sorted(os.listdir(batch_dir)) == ["failed.txt", "retry-0000.jsonl"]
+    requests = read_lines(os.path.join(batch_dir, "retry-0000.jsonl"))
+    assert [json.loads(request)["custom_id"] for request in requests] == ["2-0"]
+
+
+def test_ingest_batch_resume(batch_dir):
+    copy_fixtures(
+        batch_dir, "requests-0000.jsonl", "results-0000.jsonl", "retry-0000.jsonl", "retry-results-0000.jsonl"
+    )
+    output_path = os.path.join(batch_dir, "forecasts.csv")
+    pipeline.ingest_batch(output_path, batch_dir)
+    # The original results are not read again, so no forecast is duplicated
+    pipeline.ingest_batch(output_path, batch_dir, resume=True)
+
+    rows = read_output(output_path)
+    assert [(row["id"], row["economic_category"]) for row in rows] == [("1", "CPI"), ("2", "IR")]
+    assert read_lines(os.path.join(batch_dir, "failed.txt")) == []
@@ -0,0 +1,31 @@
+from forecasting.salvage import SalvageStats, validate_items
+from forecasting.schema import Classification
+
+
+ITEM = {
+    "forecast": "CPI inflation will stay at 2% y/y in May.", "economic_category": "cpi", "direction": "no_change",
+    "value_numerical_from": "none", "value_numerical_to": -2, "value_unit": "% y/y", "date_numerical": 5,
+    "date_unit": "months",
+}
+
+
+def test_near_misses_are_coerced():
+    stats = SalvageStats()
+    valid, failed = validate_items([ITEM], Classification, stats)
+    assert failed == []
+    assert valid[0].dict() == {
+        "forecast": ITEM["forecast"], "economic_category": "CPI", "direction": "no change",
+        "value_numerical_from": 0.0, "value_numerical_to": 2.0, "value_unit": "%y/y", "date_numerical": "5",
+        "date_unit": "month",
+    }
+    assert stats.coerced == 1
+
+
+def test_missing_and_null_fields_are_not_filled_in():
+    stats = SalvageStats()
+    items = [{"forecast": "Inflation will rise."}, dict(ITEM, direction=None, value_numerical_to=None)]
+    valid, failed = validate_items(items, Classification, stats)
+    assert valid == []
+    assert len(failed[0][1]) == 7
+    assert {error.split(":")[0] for error in failed[1][1]} == {"direction", "value_numerical_to"}
+    assert stats.coerced == 0
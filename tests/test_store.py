@@ -0,0 +1,73 @@
+import os
+
+import pytest
+
+from forecasting import pipeline, settings
+from forecasting.store import ForecastStore
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def record(doc_id, category):
+    return {
+        "id": doc_id, "forecast": f"{category} will rise.", "economic_category": category, "direction": "increase",
+        "value_numerical_from": 1.0, "value_numerical_to": 2.0, "value_unit": "%y/y", "date_numerical": "5",
+        "date_unit": "month",
+    }
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ForecastStore(str(tmp_path / "forecasts.sqlite"))
+    yield store
+    store.close()
+
+
+def test_report_ids_are_text(store):
+    store.add(1, "2.01.2004", "text 1", [record(1, "CPI"), record(1, "PPI")])
+    store.add("2", "5.01.2004", "text 2", [record(2, "CPI")])
+    store.flush()
+    assert len(store.query(report_id="1")) == len(store.query(report_id=1)) == 2
+    assert store.query(report_id=[1, "2"])["id"].tolist() == ["1", "1", "2"]
+    assert store.unchanged([1, "2", 2], ["text 1", "text 2", "changed"]).tolist() == [True, True, False]
+
+
+def test_reprocessed_report_replaces_its_forecasts(store):
+    store.add(1, "2.01.2004", "text 1", [record(1, "CPI"), record(1, "PPI")])
+    store.add(1, "2.01.2004", "text 1", [record(1, "W")])
+    store.flush()
+    assert store.query()["economic_category"].tolist() == ["W"]
+
+
+def clear_model():
+    # The model and the chains built on it are memoized with the settings of their first use
+    for getter in (pipeline.get_model, pipeline.get_chain, pipeline.get_packed_chain, pipeline.get_repair_chain):
+        getter.cache_clear()
+
+
+def test_failed_reports_are_retried_by_incremental_runs(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(settings, "model_backend", "fake")
+    monkeypatch.setattr(settings, "async_mode", False)
+    monkeypatch.setattr(settings, "use_cache", False)
+    monkeypatch.setattr(settings, "lenient_validation", False)
+    monkeypatch.setattr(settings, "metrics_path", str(tmp_path / "metrics.jsonl"))
+    monkeypatch.setattr(settings, "store_path", str(tmp_path / "forecasts.sqlite"))
+    monkeypatch.setattr(settings, "fake_invalid_rate", 1.0)
+    clear_model()
+    try:
+        pipeline.run("data/reports.csv", str(tmp_path / "failed.csv"))
+        store = ForecastStore(settings.store_path)
+        stored = store.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0]
+        store.close()
+        assert stored < 10
+
+        settings.fake_invalid_rate = 0.0
+        clear_model()
+        pipeline.run("data/reports.csv", str(tmp_path / "incremental.csv"), incremental=True)
+        store = ForecastStore(settings.store_path)
+        assert store.conn.execute("SELECT COUNT(*) FROM reports").fetchone()[0] == 10
+        store.close()
+    finally:
+        clear_model()
@@ -0,0 +1,109 @@
+import os
+
+import pandas as pd
+import pytest
+
+from forecasting import pipeline, settings
+from forecasting.streaming import CheckpointedWriter, read_checkpoint
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+COLUMNS = ["id", "forecast"]
+
+
+def records(doc_id):
+    return [{"id": doc_id, "forecast": f"forecast {doc_id}.{position}"} for position in range(2)]
+
+
+def write_all(output_path, checkpoint_path, doc_ids):
+    writer = CheckpointedWriter(output_path, checkpoint_path, COLUMNS, flush_every=2)
+    for doc_id in doc_ids:
+        writer.write(doc_id, records(doc_id))
+    writer.close()
+
+
+def read_output(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def test_resume_drops_unfinished_rows(tmp_path):
+    output_path = str(tmp_path / "forecasts.csv")
+    checkpoint_path = str(tmp_path / "forecasts.checkpoint")
+    writer = CheckpointedWriter(output_path, checkpoint_path, COLUMNS, flush_every=2)
+    for doc_id in [1, 2, 3]:
+        writer.write(doc_id, records(doc_id))
+    # Interrupted after the rows of document 3 reached the output, before its checkpoint
+    writer.output.flush()
+    writer.output.close()
+    writer.checkpoint.close()
+    assert len(pd.read_csv(output_path)) == 6
+
+    writer = CheckpointedWriter(output_path, checkpoint_path, COLUMNS, resume=True, flush_every=2)
+    assert writer.done == {"1", "2"}
+    assert pd.read_csv(output_path)["id"].tolist() == [1, 1, 2, 2]
+    for doc_id in [3, 4]:
+        writer.write(doc_id, records(doc_id))
+    writer.close()
+
+    write_all(str(tmp_path / "expected.csv"), str(tmp_path / "expected.checkpoint"), [1, 2, 3, 4])
+    assert read_output(output_path) == read_output(str(tmp_path / "expected.csv"))
+    assert read_checkpoint(checkpoint_path) == {"1", "2", "3", "4"}
+
+
+def test_resume_empty_output(tmp_path):
+    output_path = str(tmp_path / "forecasts.csv")
+    checkpoint_path = str(tmp_path / "forecasts.checkpoint")
+    open(output_path, "w").close()
+    with open(checkpoint_path, "w") as f:
+        f.write("1\n")
+
+    writer = CheckpointedWriter(output_path, checkpoint_path, COLUMNS, resume=True)
+    assert writer.done == set()
+    writer.write(1, records(1))
+    writer.close()
+    assert pd.read_csv(output_path)["id"].tolist() == [1, 1]
+
+
+def test_failed_documents_are_not_checkpointed(tmp_path):
+    output_path = str(tmp_path / "forecasts.csv")
+    checkpoint_path = str(tmp_path / "forecasts.checkpoint")
+    writer = CheckpointedWriter(output_path, checkpoint_path, COLUMNS)
+    writer.write(1, records(1))
+    writer.fail(2)
+    writer.close()
+    assert writer.failed == ["2"]
+    assert read_checkpoint(checkpoint_path) == {"1"}
+    assert pd.read_csv(output_path)["id"].tolist() == [1, 1]
+
+
+def clear_model():
+    # The model and the chains built on it are memoized with the settings of their first use
+    for getter in (pipeline.get_model, pipeline.get_chain, pipeline.get_packed_chain, pipeline.get_repair_chain):
+        getter.cache_clear()
+
+
+@pytest.fixture
+def fake_run(tmp_path, monkeypatch):
+    monkeypatch.chdir(ROOT)
+    monkeypatch.setattr(settings, "model_backend", "fake")
+    monkeypatch.setattr(settings, "async_mode", False)
+    monkeypatch.setattr(settings, "use_cache", False)
+    monkeypatch.setattr(settings, "lenient_validation", False)
+    monkeypatch.setattr(settings, "metrics_path", str(tmp_path / "metrics.jsonl"))
+    monkeypatch.setattr(settings, "fake_invalid_rate", 1.0)
+    clear_model()
+    yield str(tmp_path / "forecasts.csv")
+    clear_model()
+
+
+def test_failed_documents_are_retried_on_resume(fake_run):
+    output_path = fake_run
+    checkpoint_path = os.path.splitext(output_path)[0] + ".checkpoint"
+    pipeline.run("data/reports.csv", output_path)
+    assert len(read_checkpoint(checkpoint_path)) < 10
+
+    settings.fake_invalid_rate = 0.0
+    clear_model()
+    pipeline.run("data/reports.csv", output_path, resume=True)
+    assert read_checkpoint(checkpoint_path) == {str(doc_id) for doc_id in range(10)}